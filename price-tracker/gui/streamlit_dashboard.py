@@ -1,14 +1,23 @@
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import time
+from datetime import datetime
 import sys
 import os
+import re
+import html
+import importlib
 import json
-import hashlib
+import logging
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Final
+
+logger = logging.getLogger(__name__)
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -19,410 +28,177 @@ st.set_page_config(
 )
 
 # --- Enhanced Professional Styling ---
-st.markdown("""
-<style>
-    /* Dark Navy Background - Clean like FlowTrack */
-    body, .main, .stApp {
-        background: #0a1929;
-        background-attachment: fixed;
-    }
-    
-    /* Subtle Grid Pattern - Dark */
-    .stApp::after {
-        content: '';
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 100%;
-        background-image: 
-            linear-gradient(rgba(30, 58, 95, 0.12) 1px, transparent 1px),
-            linear-gradient(90deg, rgba(30, 58, 95, 0.12) 1px, transparent 1px);
-        background-size: 40px 40px;
-        pointer-events: none;
-        z-index: 0;
-    }
-    
-    .stApp::before {
-        content: '';
-        position: fixed;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 100%;
-        background: radial-gradient(circle at 20% 50%, rgba(25, 118, 210, 0.05) 0%, transparent 50%),
-                    radial-gradient(circle at 80% 80%, rgba(33, 150, 243, 0.03) 0%, transparent 50%);
-        pointer-events: none;
-        z-index: 0;
-    }
-    
-    h1, h2, h3, h4, h5 {
-        color: #ffffff;
-        font-family: 'Nunito', 'Segoe UI', Arial;
-        text-shadow: 0 2px 12px rgba(25, 118, 210, 0.3);
-        font-weight: 700;
-    }
-    
-    .big-metric {
-        font-size: 2.5rem;
-        font-weight: 900;
-        color: #ffffff;
-        text-shadow: 0 2px 8px rgba(33, 150, 243, 0.5);
-    }
-    
-    /* Glass morphism cards with visible borders like FlowTrack */
-    .metric-card {
-        background: rgba(15, 31, 51, 0.5);
-        backdrop-filter: blur(12px);
-        -webkit-backdrop-filter: blur(12px);
-        border-radius: 16px;
-        margin: 6px 0px 16px;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.4);
-        padding: 20px;
-        border: 2px solid rgba(30, 58, 95, 0.6);
-        transition: all 0.3s ease;
-        position: relative;
-    }
-    
-    .metric-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        bottom: 0;
-        border-radius: 16px;
-        border: 1px solid rgba(33, 150, 243, 0.2);
-        pointer-events: none;
-    }
-    
-    .metric-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 12px 40px rgba(25, 118, 210, 0.5);
-        background: rgba(19, 47, 76, 0.7);
-        border-color: rgba(33, 150, 243, 0.8);
-    }
-    
-    .section-card {
-        background: rgba(15, 31, 51, 0.4);
-        backdrop-filter: blur(15px);
-        -webkit-backdrop-filter: blur(15px);
-        border-radius: 16px;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
-        margin-top: 16px;
-        padding: 24px;
-        border: 2px solid rgba(30, 58, 95, 0.5);
-    }
-    
-    .stButton > button {
-        background: linear-gradient(135deg, #142743 0%, #19446e 100%);
-        color: #fff;
-        border-radius: 22px;
-        font-size: 1rem;
-        padding: 10px 32px;
-        font-weight: 700;
-        border: 2px solid #233f5e;
-        box-shadow: 0 4px 16px rgba(10, 25, 41, 0.25);
-        margin-bottom: 6px;
-        transition: all 0.2s cubic-bezier(0.4, 0, 0.2, 1);
-        letter-spacing: 0.5px;
-    }
-    
-    .stButton > button:hover {
-        background: linear-gradient(135deg, #19446e 0%, #2196f3 100%);
-        color: #fff;
-        border-color: #2196f3;
-        box-shadow: 0 6px 22px rgba(33, 150, 243, 0.38);
-        transform: translateY(-2px) scale(1.04);
-    }
-    
-    .stButton > button:active {
-        background: #142743;
-        border-color: #132f4c;
-        color: #b0bec5;
-        box-shadow: 0 3px 10px rgba(33, 150, 243, 0.22);
-        transform: scale(0.98);
-    }
-    
-    /* For prominent or "primary" actions */
-    .stButton > button[kind="primary"] {
-        background: linear-gradient(90deg, #19446e 0%, #2196f3 100%);
-        border-color: #2196f3;
-    }
-    
-    /* Dark Input fields with borders */
-    .stTextInput input, .stNumberInput input {
-        border-radius: 12px !important; 
-        border: 2px solid rgba(30, 58, 95, 0.7) !important;
-        font-weight: 600; 
-        background: rgba(15, 31, 51, 0.6) !important;
-        backdrop-filter: blur(10px);
-        transition: all 0.3s ease;
-        color: #ffffff !important;
-        padding: 12px 16px !important;
-    }
-    
-    /* Light Gray Placeholder */
-    .stTextInput input::placeholder,
-    .stNumberInput input::placeholder {
-        color: #78909c !important;
-        opacity: 1 !important;
-        font-weight: 500 !important;
-    }
-    
-    .stTextInput input:focus, .stNumberInput input:focus {
-        background: rgba(19, 47, 76, 0.8) !important;
-        border-color: #2196f3 !important;
-        box-shadow: 0 0 0 3px rgba(33, 150, 243, 0.25);
-        color: #ffffff !important;
-    }
-    
-    /* Select boxes with borders */
-    .stSelectbox > div > div {
-        background: rgba(15, 31, 51, 0.6) !important;
-        border-radius: 12px;
-        border: 2px solid rgba(30, 58, 95, 0.7) !important;
-        color: #ffffff !important;
-    }
-    
-    .stSelectbox > div > div:hover {
-        border-color: #2196f3 !important;
-    }
-    
-    /* Multiselect */
-    .stMultiSelect > div > div {
-        background: rgba(15, 31, 51, 0.6) !important;
-        border: 2px solid rgba(30, 58, 95, 0.7) !important;
-        border-radius: 12px;
-    }
-    
-    /* Data tables */
-    .stDataFrame, .dataframe {
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(10px);
-        border-radius: 13px;
-        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.3);
-        margin-bottom: 8px;
-        border: 1px solid rgba(30, 58, 95, 0.3);
-    }
-    
-    /* Dark Navy Sidebar with Grid Pattern */
-    [data-testid="stSidebar"] {
-        background: linear-gradient(180deg, #0a1929 0%, #0f1f33 50%, #132f4c 100%);
-        background-attachment: fixed;
-        border-right: 2px solid rgba(30, 58, 95, 0.7);
-        box-shadow: 2px 0 20px rgba(0, 0, 0, 0.4);
-        padding: 2.2rem 1.2rem 1.2rem 1.2rem;
-    }
-    
-    [data-testid="stSidebar"] h1, 
-    [data-testid="stSidebar"] h2, 
-    [data-testid="stSidebar"] h3,
-    [data-testid="stSidebar"] p,
-    [data-testid="stSidebar"] label {
-        color: #ffffff !important;
-        text-shadow: 0 1px 3px rgba(0, 0, 0, 0.3);
-    }
-    
-    [data-testid="stSidebar"] .stMetric {
-        background: rgba(25, 118, 210, 0.12);
-        backdrop-filter: blur(10px);
-        padding: 1rem;
-        border-radius: 12px;
-        margin: 0.5rem 0;
-        border: 2px solid rgba(30, 58, 95, 0.6);
-        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.3);
-    }
-    
-    [data-testid="stSidebar"] .stButton > button {
-        background: linear-gradient(90deg, #1976d2 0%, #2196f3 100%);
-        font-weight: 700;
-        color: #ffffff;
-        border: none;
-        border-radius: 25px;
-        box-shadow: 0 3px 12px rgba(25, 118, 210, 0.4);
-        margin-top: 0.7rem;
-        padding: 10px 24px;
-    }
-    
-    [data-testid="stSidebar"] .stButton > button:hover {
-        background: linear-gradient(90deg, #42a5f5 0%, #2196f3 100%);
-        transform: translateY(-2px);
-        box-shadow: 0 5px 18px rgba(33, 150, 243, 0.6);
-    }
-    
-    [data-testid="stSidebar"] .stCaption {
-        color: #b0bec5 !important;
-    }
-    
-    /* Labels */
-    .stSelectbox label, .stRadio label, .stCheckbox label, .stMultiSelect label {
-        color: #b0bec5 !important;
-        font-weight: 700;
-        text-shadow: 0 1px 3px rgba(0, 0, 0, 0.3);
-    }
-    
-    /* Notification boxes with borders */
-    .stSuccess {
-        background: rgba(16, 185, 129, 0.15) !important;
-        backdrop-filter: blur(10px);
-        border-left: 4px solid #10b981 !important;
-        border: 2px solid rgba(16, 185, 129, 0.3) !important;
-        border-radius: 12px;
-        font-weight: 600;
-        color: white !important;
-        box-shadow: 0 4px 15px rgba(16, 185, 129, 0.3);
-    }
-    
-    .stError {
-        background: rgba(244, 67, 54, 0.15) !important;
-        backdrop-filter: blur(10px);
-        border-left: 4px solid #f44336 !important;
-        border: 2px solid rgba(244, 67, 54, 0.3) !important;
-        border-radius: 12px;
-        font-weight: 600;
-        color: white !important;
-        box-shadow: 0 4px 15px rgba(244, 67, 54, 0.3);
-    }
-    
-    .stInfo {
-        background: rgba(33, 150, 243, 0.15) !important;
-        backdrop-filter: blur(10px);
-        border-left: 4px solid #2196f3 !important;
-        border: 2px solid rgba(33, 150, 243, 0.3) !important;
-        border-radius: 12px;
-        font-weight: 500;
-        color: white !important;
-        box-shadow: 0 4px 15px rgba(33, 150, 243, 0.3);
-    }
-    
-    .stWarning {
-        background: rgba(255, 152, 0, 0.15) !important;
-        backdrop-filter: blur(10px);
-        border-left: 4px solid #ff9800 !important;
-        border: 2px solid rgba(255, 152, 0, 0.3) !important;
-        border-radius: 12px;
-        font-weight: 600;
-        color: white !important;
-        box-shadow: 0 4px 15px rgba(255, 152, 0, 0.3);
-    }
-    
-    /* Expander with border */
-    .streamlit-expanderHeader {
-        background: rgba(15, 31, 51, 0.5);
-        backdrop-filter: blur(10px);
-        border-radius: 12px;
-        border: 2px solid rgba(30, 58, 95, 0.6);
-        color: white !important;
-        font-weight: 600;
-    }
-    
-    /* Tabs with borders */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 10px;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background: rgba(15, 31, 51, 0.5);
-        backdrop-filter: blur(10px);
-        border-radius: 12px;
-        color: #78909c;
-        font-weight: 600;
-        padding: 12px 24px;
-        border: 2px solid rgba(30, 58, 95, 0.5);
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #1976d2 0%, #2196f3 100%);
-        border: 2px solid rgba(33, 150, 243, 0.6);
-        color: white;
-    }
-    
-    /* Slider */
-    .stSlider label {
-        color: #b0bec5 !important;
-        font-weight: 600;
-    }
-    
-    /* Radio buttons with borders */
-    .stRadio > div {
-        background: rgba(15, 31, 51, 0.4);
-        padding: 0.7rem;
-        border-radius: 12px;
-        border: 2px solid rgba(30, 58, 95, 0.4);
-    }
-    
-    /* User avatar */
-    .user-avatar {
-        width: 60px;
-        height: 60px;
-        border-radius: 50%;
-        background: linear-gradient(135deg, #1976d2, #2196f3);
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 1.8rem;
-        font-weight: 700;
-        color: white;
-        box-shadow: 0 4px 16px rgba(25, 118, 210, 0.6);
-        margin: 0 auto;
-        border: 3px solid rgba(33, 150, 243, 0.4);
-    }
-    
-    /* Badge - Rounded Pills */
-    .badge {
-        display: inline-block;
-        padding: 6px 16px;
-        border-radius: 20px;
-        font-size: 0.7rem;
-        font-weight: 700;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-        margin: 0 4px;
-        border: 2px solid;
-    }
-    
-    .badge-success {
-        background: rgba(16, 185, 129, 0.15);
-        color: #10b981;
-        border-color: #10b981;
-    }
-    
-    .badge-danger {
-        background: rgba(244, 67, 54, 0.15);
-        color: #f44336;
-        border-color: #f44336;
-    }
-    
-    .badge-warning {
-        background: rgba(255, 152, 0, 0.15);
-        color: #ff9800;
-        border-color: #ff9800;
-    }
-    
-    .badge-info {
-        background: rgba(0, 188, 212, 0.15);
-        color: #00bcd4;
-        border-color: #00bcd4;
-    }
-</style>
-""", unsafe_allow_html=True)
+_CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard.css")
+
+@st.cache_resource(show_spinner=False)
+def _css():
+    """Read and minify the dashboard stylesheet once per server process (shared, never copied)"""
+    with open(_CSS_PATH, encoding="utf-8") as f:
+        css = f.read()
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    return f"<style>{css.strip()}</style>"
+
+# Streamlit drops elements that a rerun does not emit again, so the stylesheet
+# has to be re-sent every run; keep that payload as small as possible instead
+st.markdown(_css(), unsafe_allow_html=True)
 
 # --- Utility Functions ---
+# Below this many points SVG Scatter renders just as fast and draws error bars correctly
+SCATTERGL_MIN_POINTS = 1000
+
+def scatter_trace(n_points):
+    """Pick the WebGL trace type for large series, SVG for small ones"""
+    import plotly.graph_objects as go
+    return go.Scattergl if n_points >= SCATTERGL_MIN_POINTS else go.Scatter
+
+# Concurrent scrapes for the "Check Prices Now" quick action
+CHECK_PRICES_WORKERS = 8
+# Async fetch attempts per URL before falling back to ProductScraper.scrape_product()
+CHECK_PRICES_ATTEMPTS = 2
+CHECK_PRICES_RETRY_DELAY = 0.5  # seconds
+
+# Upper bound on points sent to the browser for a single time series
+LTTB_TARGET_POINTS = 2000
+
+@st.cache_data(show_spinner=False)
+def downsample_series(dates, values, target=LTTB_TARGET_POINTS):
+    """Largest-Triangle-Three-Buckets downsampling that keeps visual peaks"""
+    x = np.asarray(dates)
+    y = np.asarray(values, dtype=float)
+    n = len(y)
+    if n <= target or target < 3:
+        return x, y
+
+    xs = x.astype('datetime64[ns]').astype(np.int64) if x.dtype.kind == 'M' else x
+    xs = xs.astype(float)
+
+    # First and last points are always kept; the rest is split into target - 2 buckets
+    edges = np.linspace(1, n - 1, target - 1).astype(np.int64)
+    keep = np.empty(target, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(target - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xs[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (xs[a] - avg_x) * (y[start:end] - y[a])
+            - (xs[a] - xs[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+# Plotly modebar options shared by the interactive charts
+PLOTLY_CONFIG = {'displaylogo': False, 'responsive': True}
+
+# Analytics trend chart: most-tracked products only, each series LTTB-reduced
+ANALYTICS_MAX_TRACES = 10
+ANALYTICS_TRACE_POINTS = 200
+# Above this many plotted points markers are dropped and only lines are drawn
+MARKERS_MAX_POINTS = 500
+# Cached figures kept per chart; older data versions are evicted
+CACHED_FIGURES = 4
+
+# Figures are cached as resources: st.plotly_chart takes a Figure as-is, whereas a dict
+# (or a figure unpickled from cache_data) is rebuilt and validated on every rerun
+@st.cache_resource(show_spinner=False, max_entries=CACHED_FIGURES)
+def trend_fig(series):
+    """Dashboard price-trend figure for a tuple of (name, xs, ys) series, rebuilt only when the data changes"""
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    total = sum(len(ys) for _, _, ys in series)
+    mode = 'lines' if total > MARKERS_MAX_POINTS else 'lines+markers'
+    for name, xs, ys in series:
+        fig.add_trace(scatter_trace(total)(
+            x=xs,
+            y=ys,
+            mode=mode,
+            name=name,
+            line=dict(width=3),
+            marker=dict(size=8)
+        ))
+    fig.update_layout(height=340, template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color='white'))
+    return fig
+
+@st.cache_resource(show_spinner=False, max_entries=CACHED_FIGURES)
+def category_pie(category_counts):
+    """Category donut chart for a tuple of (category, count) pairs"""
+    import plotly.express as px
+    cat_data = pd.DataFrame(list(category_counts), columns=['Category', 'Count'])
+    fig_pie = px.pie(cat_data, values='Count', names='Category', hole=0.5, color_discrete_sequence=px.colors.sequential.Teal)
+    fig_pie.update_layout(height=340, template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', font=dict(color='white'))
+    return fig_pie
+
+_PRODUCT_CARD_TPL = string.Template("""
+    <div class='product-card'>
+        <h4>${name}</h4>
+        <p>Current Price: ${price}</p>
+        <p>Site: ${site}</p>
+        <p><em>No price history data available</em></p>
+    </div>
+""")
+
+_METRIC_CARD_TPL = string.Template("""
+    <div class='metric-card'>
+        <h4>${title}</h4>
+        <div class='big-metric'>${value}</div>
+        <span class='badge badge-${badge}'>${label}</span>
+    </div>
+""")
+
+_BUY_CARD_TPL = string.Template("""
+    <div class='metric-card' style='border-color: #10b981;'>
+        <h4>🛒 BUY NOW</h4>
+        <p><strong>Reason:</strong> ${reason}</p>
+        <p><strong>Confidence:</strong> ${confidence}</p>
+    </div>
+""")
+
+_WAIT_CARD_TPL = string.Template("""
+    <div class='metric-card' style='border-color: #f59e0b;'>
+        <h4>⏳ WAIT ${days} DAYS</h4>
+        <p><strong>Reason:</strong> ${reason}</p>
+        <p><strong>Potential Savings:</strong> ₹${savings} (${savings_pct}%)</p>
+        <p><strong>Confidence:</strong> ${confidence}</p>
+    </div>
+""")
+
+# Read-only so no caller can mutate the shared table
+_CURRENCY_SYMBOLS: Final = MappingProxyType({'USD': '$', 'EUR': '€', 'GBP': '£', 'INR': '₹'})
+
 def format_price(amount, currency='INR'):
     """Format price with currency symbol - always requires currency parameter"""
-    symbols = {'USD': '$', 'EUR': '€', 'GBP': '£', 'INR': '₹'}
-    symbol = symbols.get(currency, '₹')
-    try:
-        amt = float(amount) if amount else 0
-    except:
+    symbol = _CURRENCY_SYMBOLS.get(currency, '₹')
+    if isinstance(amount, (int, float)):
+        amt = amount
+    elif not amount:
         amt = 0
+    else:
+        try:
+            amt = float(amount)
+        except (TypeError, ValueError):
+            amt = 0
     return f"{symbol}{amt:.2f}"
 
 
+# orjson is optional; settings I/O falls back to the stdlib json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+@st.cache_data(ttl=60, show_spinner=False)
 def load_settings():
     try:
-        with open('data/settings.json', 'r') as f:
+        if ORJSON_AVAILABLE:
+            with open('data/settings.json', 'rb') as f:
+                return orjson.loads(f.read())
+        with open('data/settings.json', 'r', encoding='utf-8') as f:
             return json.load(f)
     except FileNotFoundError:
         return {
@@ -438,9 +214,19 @@ def load_settings():
 
 def save_settings(settings):
     os.makedirs('data', exist_ok=True)
-    with open('data/settings.json', 'w') as f:
-        json.dump(settings, f, indent=4)
+    # Write a temp file and swap it in, so readers never see a half-written file
+    tmp_path = 'data/settings.json.tmp'
+    if ORJSON_AVAILABLE:
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(settings, option=orjson.OPT_INDENT_2))
+    else:
+        # Same bytes as the orjson path: 2-space indent, UTF-8 rather than \u escapes
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(settings, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, 'data/settings.json')
+    load_settings.clear()
 
+@lru_cache(maxsize=64)
 def get_user_initials(name):
     """Get user initials for avatar"""
     if not name:
@@ -450,15 +236,29 @@ def get_user_initials(name):
         return f"{parts[0][0]}{parts[1][0]}".upper()
     return name[0].upper()
 
+def _avatar_html(username, email):
+    """Sidebar profile block for the given user"""
+    return f"""
+        <div style='text-align: center; margin-bottom: 24px;'>
+            <div class='user-avatar'>{get_user_initials(username)}</div>
+            <h3 style='margin-top: 12px;'>@{username}</h3>
+            <p style='font-size: 0.85rem; opacity: 0.8;'>{email}</p>
+        </div>
+    """
+
     # --- INSTANT ALERT FUNCTIONS ---
 import smtplib
 from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 def send_email_notification(to_email, subject, body):
     """Send email alert using the proper notifier"""
     try:
-        if backend_available and 'notifier' in st.session_state:
+        if backend_available:
+            notifier = get_notifier()
             # Use the proper notifier from the backend
             product_info = {
                 'name': subject.replace('🚨 Price Alert: ', ''),
@@ -469,25 +269,22 @@ def send_email_notification(to_email, subject, body):
             }
             
             # Create a custom email message
-            from email.mime.text import MIMEText
-            from email.mime.multipart import MIMEMultipart
-            
             msg = MIMEMultipart("alternative")
             msg["Subject"] = subject
-            msg["From"] = st.session_state.notifier.sender_email
+            msg["From"] = notifier.sender_email
             msg["To"] = to_email
             
             # Create both text and HTML versions
             text_part = MIMEText(body, "plain")
-            html_part = MIMEText(st.session_state.notifier._create_html_body(product_info), "html")
+            html_part = MIMEText(notifier._create_html_body(product_info), "html")
             msg.attach(text_part)
             msg.attach(html_part)
             
             # Send using the notifier's SMTP settings
-            with smtplib.SMTP(st.session_state.notifier.smtp_server, st.session_state.notifier.smtp_port) as server:
+            with smtplib.SMTP(notifier.smtp_server, notifier.smtp_port) as server:
                 server.starttls()
-                server.login(st.session_state.notifier.sender_email, st.session_state.notifier.sender_password)
-                server.sendmail(st.session_state.notifier.sender_email, to_email, msg.as_string())
+                server.login(notifier.sender_email, notifier.sender_password)
+                server.sendmail(notifier.sender_email, to_email, msg.as_string())
             
             print("✅ Email sent via notifier")
         else:
@@ -509,62 +306,41 @@ def send_email_notification(to_email, subject, body):
     except Exception as e:
         print(f"❌ Email error: {e}")
 
+# Keeps DNS and the TLS connection to api.telegram.org alive between alerts
+_tg_session = requests.Session()
+_tg_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
 def send_telegram_notification(bot_token, chat_id, message):
     """Send Telegram alert"""
     try:
         url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
         data = {'chat_id': chat_id, 'text': message, 'parse_mode': 'Markdown'}
-        response = requests.post(url, data=data)
+        response = _tg_session.post(url, data=data, timeout=5)
         if response.status_code == 200:
             print("✅ Telegram sent")
+            return True
+        print(f"❌ Telegram error: HTTP {response.status_code}")
     except Exception as e:
         print(f"❌ Telegram error: {e}")
+    return False
 
-def send_price_alert(product_name, current_price, alert_price, product_url, currency='INR'):
-    """Send instant alert when price below threshold"""
-    settings = load_settings()
-    currency_symbols = {'USD': '$', 'EUR': '€', 'GBP': '£', 'INR': '₹'}
-    symbol = currency_symbols.get(currency, '₹')
-    
-    # Calculate savings
-    savings = alert_price - current_price
-    savings_pct = (savings / alert_price) * 100 if alert_price > 0 else 0
-    
-    # Email
-    email_address = settings.get('email_address', 'user@example.com')
-    subject = f"🚨 INSTANT ALERT: {product_name} - Price Below Target!"
-    
-    # Create proper product_info for the notifier
-    product_info = {
-        'name': product_name,
-        'new_price': current_price,
-        'old_price': alert_price,  # Using alert_price as "old_price" for comparison
-        'url': product_url,
-        'site': 'Price Tracker',
-        'price_change': -savings_pct,  # Negative because it's a drop
-        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    }
-    
-    try:
-        # Use the proper notifier for HTML email
-        if backend_available and 'notifier' in st.session_state:
-            # Create custom HTML email for instant alert
-            html_body = f"""
+# Alert bodies are compiled once; send_price_alert() only substitutes values
+_ALERT_HTML_TPL = string.Template("""
 <!DOCTYPE html>
 <html>
 <head>
     <style>
-        body {{ font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #f8f9fa; }}
-        .container {{ max-width: 600px; margin: 0 auto; background-color: white; border-radius: 10px; overflow: hidden; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
-        .header {{ background: linear-gradient(135deg, #ff6b6b, #ee5a24); color: white; padding: 30px; text-align: center; }}
-        .content {{ padding: 30px; }}
-        .price-box {{ background-color: #fff3cd; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 5px solid #ffc107; }}
-        .price-current {{ font-size: 32px; font-weight: bold; color: #28a745; }}
-        .price-alert {{ font-size: 20px; color: #6c757d; }}
-        .savings {{ font-size: 24px; color: #dc3545; font-weight: bold; }}
-        .button {{ display: inline-block; background: linear-gradient(135deg, #ff6b6b, #ee5a24); color: white; padding: 15px 30px; text-decoration: none; border-radius: 8px; margin: 20px 0; font-weight: bold; }}
-        .footer {{ background-color: #f8f9fa; padding: 20px; text-align: center; color: #6c757d; font-size: 12px; }}
-        .alert-badge {{ background: #dc3545; color: white; padding: 5px 15px; border-radius: 20px; font-size: 14px; font-weight: bold; }}
+        body { font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #f8f9fa; }
+        .container { max-width: 600px; margin: 0 auto; background-color: white; border-radius: 10px; overflow: hidden; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }
+        .header { background: linear-gradient(135deg, #ff6b6b, #ee5a24); color: white; padding: 30px; text-align: center; }
+        .content { padding: 30px; }
+        .price-box { background-color: #fff3cd; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 5px solid #ffc107; }
+        .price-current { font-size: 32px; font-weight: bold; color: #28a745; }
+        .price-alert { font-size: 20px; color: #6c757d; }
+        .savings { font-size: 24px; color: #dc3545; font-weight: bold; }
+        .button { display: inline-block; background: linear-gradient(135deg, #ff6b6b, #ee5a24); color: white; padding: 15px 30px; text-decoration: none; border-radius: 8px; margin: 20px 0; font-weight: bold; }
+        .footer { background-color: #f8f9fa; padding: 20px; text-align: center; color: #6c757d; font-size: 12px; }
+        .alert-badge { background: #dc3545; color: white; padding: 5px 15px; border-radius: 20px; font-size: 14px; font-weight: bold; }
     </style>
 </head>
 <body>
@@ -576,21 +352,21 @@ def send_price_alert(product_name, current_price, alert_price, product_url, curr
         </div>
 
         <div class="content">
-            <h2 style="color: #333; margin-bottom: 20px;">{product_name}</h2>
+            <h2 style="color: #333; margin-bottom: 20px;">${product_name}</h2>
 
             <div class="price-box">
                 <div style="text-align: center;">
-                    <div class="price-current">{symbol}{current_price:.2f}</div>
+                    <div class="price-current">${symbol}${current_price}</div>
                     <div style="font-size: 16px; color: #6c757d; margin-top: 5px;">Current Price</div>
                 </div>
 
                 <div style="text-align: center; margin-top: 15px;">
-                    <div class="price-alert">{symbol}{alert_price:.2f}</div>
+                    <div class="price-alert">${symbol}${alert_price}</div>
                     <div style="font-size: 14px; color: #6c757d;">Your Alert Price</div>
                 </div>
 
                 <div style="text-align: center; margin-top: 20px;">
-                    <div class="savings">💰 You Save: {symbol}{savings:.2f} ({savings_pct:.1f}% OFF!)</div>
+                    <div class="savings">💰 You Save: ${symbol}${savings} (${savings_pct}% OFF!)</div>
                 </div>
             </div>
 
@@ -600,7 +376,7 @@ def send_price_alert(product_name, current_price, alert_price, product_url, curr
             </p>
 
             <div style="text-align: center;">
-                <a href="{product_url}" class="button">
+                <a href="${product_url}" class="button">
                     🛍️ View Product Now
                 </a>
             </div>
@@ -608,86 +384,250 @@ def send_price_alert(product_name, current_price, alert_price, product_url, curr
 
         <div class="footer">
             <p>This is an automated instant alert from your Price Tracker Pro</p>
-            <p>🤖 Sent at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+            <p>🤖 Sent at: ${sent_at}</p>
         </div>
     </div>
 </body>
 </html>
-"""
-            
-            # Create message
-            from email.mime.text import MIMEText
-            from email.mime.multipart import MIMEMultipart
-            
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = st.session_state.notifier.sender_email
-            msg["To"] = email_address
-            
-            # Create both text and HTML versions
-            text_message = f"""🚨 INSTANT PRICE ALERT! 🚨
+""")
+
+_ALERT_TEXT_TPL = string.Template("""🚨 INSTANT PRICE ALERT! 🚨
 
-Product: {product_name}
-Current Price: {symbol}{current_price:.2f}
-Your Alert Price: {symbol}{alert_price:.2f}
-You Save: {symbol}{savings:.2f} ({savings_pct:.1f}% OFF!)
+Product: ${product_name}
+Current Price: ${symbol}${current_price}
+Your Alert Price: ${symbol}${alert_price}
+You Save: ${symbol}${savings} (${savings_pct}% OFF!)
 
 This product is already below your target price!
 Don't miss this deal - act fast!
 
-View Product: {product_url}
+View Product: ${product_url}
 
 ---
 🤖 Price Tracker Pro - Instant Alert System
-Sent at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
-            
-            text_part = MIMEText(text_message, "plain")
-            html_part = MIMEText(html_body, "html")
-            msg.attach(text_part)
-            msg.attach(html_part)
-            
-            # Send using the notifier's SMTP settings
-            with smtplib.SMTP(st.session_state.notifier.smtp_server, st.session_state.notifier.smtp_port) as server:
-                server.starttls()
-                server.login(st.session_state.notifier.sender_email, st.session_state.notifier.sender_password)
-                server.sendmail(st.session_state.notifier.sender_email, email_address, msg.as_string())
-            
-            print(f"✅ Instant email alert sent for {product_name}")
-        else:
-            # Fallback to simple email
-            send_email_notification(email_address, subject, text_message)
-            print(f"✅ Instant email alert sent for {product_name}")
-    except Exception as e:
-        print(f"❌ Email alert failed: {e}")
-    
-    # Telegram
-    bot_token = settings.get('telegram_token', '')
-    chat_id = settings.get('telegram_chat_id', '1934728827')  # Use from settings
-    
-    if bot_token and chat_id:
-        telegram_msg = f"""🚨 *INSTANT PRICE ALERT!* 🚨
+Sent at: ${sent_at}""")
+
+_ALERT_TELEGRAM_TPL = string.Template("""🚨 *INSTANT PRICE ALERT!* 🚨
 
-*{product_name}*
-💰 Current: {symbol}{current_price:.2f}
-🎯 Target: {symbol}{alert_price:.2f}
-💵 You Save: {symbol}{savings:.2f} ({savings_pct:.1f}% OFF!)
+*${product_name}*
+💰 Current: ${symbol}${current_price}
+🎯 Target: ${symbol}${alert_price}
+💵 You Save: ${symbol}${savings} (${savings_pct}% OFF!)
 
 This product is already below your target price!
 Don't miss this deal - act fast!
 
-[View Product]({product_url})
+[View Product](${product_url})
 
 ---
 🤖 *Price Tracker Pro - Instant Alert*
-⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
-        
-        try:
-            send_telegram_notification(bot_token, chat_id, telegram_msg)
-            print(f"✅ Instant Telegram alert sent for {product_name}")
-        except Exception as e:
-            print(f"❌ Telegram alert failed: {e}")
+⏰ ${sent_at}""")
+
+# A logged-in alert SMTP connection is closed after this long without sends
+SMTP_IDLE_TIMEOUT = 60  # seconds
+
+class _SmtpConnections:
+    """Logged-in SMTP connections for alert emails, one per sender account"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._conns = {}  # (server, port, sender) -> [connection, last used]
+
+    @staticmethod
+    def _key(notifier):
+        return (notifier.smtp_server, notifier.smtp_port, notifier.sender_email)
+
+    def connect(self, notifier):
+        """Connection for the notifier's account, reconnecting if the server dropped it; hold self.lock"""
+        entry = self._conns.get(self._key(notifier))
+        if entry is not None:
+            try:
+                if entry[0].noop()[0] == 250:
+                    entry[1] = time.monotonic()
+                    return entry[0]
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.drop(notifier)
+
+        server = smtplib.SMTP(notifier.smtp_server, notifier.smtp_port, timeout=30)
+        server.starttls()
+        server.login(notifier.sender_email, notifier.sender_password)
+        self._conns[self._key(notifier)] = [server, time.monotonic()]
+        return server
+
+    def drop(self, notifier):
+        """Log out of the notifier's account; hold self.lock"""
+        entry = self._conns.pop(self._key(notifier), None)
+        if entry is not None:
+            try:
+                entry[0].quit()
+            except (smtplib.SMTPException, OSError):
+                entry[0].close()
+
+    def close_idle(self):
+        """Log out of accounts that have sent nothing for SMTP_IDLE_TIMEOUT seconds"""
+        with self.lock:
+            now = time.monotonic()
+            for key, (server, last_used) in list(self._conns.items()):
+                if now - last_used >= SMTP_IDLE_TIMEOUT:
+                    del self._conns[key]
+                    try:
+                        server.quit()
+                    except (smtplib.SMTPException, OSError):
+                        server.close()
+
+    def close_idle_later(self):
+        timer = threading.Timer(SMTP_IDLE_TIMEOUT, self.close_idle)
+        timer.daemon = True
+        timer.start()
+
+@st.cache_resource(show_spinner=False)
+def _smtp_connections():
+    """Alert SMTP connections shared by every session, so each account logs in once"""
+    return _SmtpConnections()
+
+def _alert_fields(product_name, current_price, alert_price, product_url, currency='INR'):
+    """Template values for one product's alert"""
+    savings = alert_price - current_price
+    savings_pct = (savings / alert_price) * 100 if alert_price > 0 else 0
+    return {
+        'product_name': product_name,
+        'product_url': product_url,
+        'symbol': _CURRENCY_SYMBOLS.get(currency, '₹'),
+        'current_price': f"{current_price:.2f}",
+        'alert_price': f"{alert_price:.2f}",
+        'savings': f"{savings:.2f}",
+        'savings_pct': f"{savings_pct:.1f}",
+        'sent_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+def send_price_alerts_bulk(alerts):
+    """
+    Send instant alerts for several products at once
+
+    Each alert is a dict of send_price_alert() arguments. All emails go out
+    over one logged-in SMTP connection per sender account, which is reused
+    by later alerts and closed after SMTP_IDLE_TIMEOUT seconds without sends.
+
+    Returns a list of failure messages (empty when everything was sent).
+    """
+    failures = []
+    if not alerts:
+        return failures
+    settings = load_settings()
+    email_address = settings.get('email_address', 'user@example.com')
+    bot_token = settings.get('telegram_token', '')
+    chat_id = settings.get('telegram_chat_id', '1934728827')  # Use from settings
+    
+    # Nothing to render when neither channel is set up yet
+    email_ok = bool(email_address) and email_address != 'user@example.com'
+    telegram_ok = bool(bot_token and chat_id)
+    if not (email_ok or telegram_ok):
+        print("⚠️ No alert channel configured - skipping alert")
+        failures.append("No email or Telegram configured - price alert not sent")
+        return failures
+    prepared = [_alert_fields(**alert) for alert in alerts]
+    
+    # Email
+    try:
+        if not email_ok:
+            print("⚠️ Email address not configured - skipping email alert")
+        elif backend_available:
+            notifier = get_notifier()
+            smtp = _smtp_connections()
+            with smtp.lock:
+                try:
+                    server = smtp.connect(notifier)
+                    for fields in prepared:
+                        msg = MIMEMultipart("alternative")
+                        msg["Subject"] = f"🚨 INSTANT ALERT: {fields['product_name']} - Price Below Target!"
+                        msg["From"] = notifier.sender_email
+                        msg["To"] = email_address
+                        
+                        # Create both text and HTML versions
+                        msg.attach(MIMEText(_ALERT_TEXT_TPL.substitute(fields), "plain"))
+                        msg.attach(MIMEText(_ALERT_HTML_TPL.substitute(fields), "html"))
+                        server.sendmail(notifier.sender_email, email_address, msg.as_string())
+                        print(f"✅ Instant email alert sent for {fields['product_name']}")
+                except Exception:
+                    smtp.drop(notifier)
+                    raise
+            smtp.close_idle_later()
+        else:
+            # Fallback to simple email
+            for fields in prepared:
+                subject = f"🚨 INSTANT ALERT: {fields['product_name']} - Price Below Target!"
+                send_email_notification(email_address, subject, _ALERT_TEXT_TPL.substitute(fields))
+                print(f"✅ Instant email alert sent for {fields['product_name']}")
+    except Exception as e:
+        print(f"❌ Email alert failed: {e}")
+        failures.append(f"Email alert failed: {e}")
+    
+    # Telegram
+    if telegram_ok:
+        for fields in prepared:
+            if send_telegram_notification(bot_token, chat_id, _ALERT_TELEGRAM_TPL.substitute(fields)):
+                print(f"✅ Instant Telegram alert sent for {fields['product_name']}")
+            else:
+                failures.append(f"Telegram alert failed for {fields['product_name']}")
     else:
         print("⚠️ Telegram not configured - skipping Telegram alert")
+    return failures
+
+def send_price_alert(product_name, current_price, alert_price, product_url, currency='INR'):
+    """Send instant alert when price below threshold; returns failure messages"""
+    return send_price_alerts_bulk([{
+        'product_name': product_name,
+        'current_price': current_price,
+        'alert_price': alert_price,
+        'product_url': product_url,
+        'currency': currency,
+    }])
+
+@st.cache_resource(show_spinner=False)
+def _alert_pool():
+    """
+    Background workers for alert delivery, shared by every session
+
+    Several workers keep one slow SMTP server or Telegram call from holding
+    up other users' alerts; emails for the same account still go out one
+    batch at a time under _SmtpConnections' lock.
+    """
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="alerts")
+
+def send_price_alerts_async(alerts):
+    """
+    Queue send_price_alerts_bulk() in the background so the page does not wait on SMTP/Telegram
+
+    Failures are added to this session's alert_failures list and shown by
+    show_alert_failures() on the next rerun.
+    """
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    # The alert code reads cached settings, which need this session's context
+    ctx = get_script_run_ctx()
+    failures = st.session_state.setdefault('alert_failures', [])
+
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        failures.extend(send_price_alerts_bulk(alerts))
+
+    return _alert_pool().submit(run)
+
+def send_price_alert_async(product_name, current_price, alert_price, product_url, currency='INR'):
+    """Queue send_price_alert() in the background"""
+    return send_price_alerts_async([{
+        'product_name': product_name,
+        'current_price': current_price,
+        'alert_price': alert_price,
+        'product_url': product_url,
+        'currency': currency,
+    }])
+
+def show_alert_failures():
+    """Toast the background alert failures reported since the last rerun"""
+    failures = st.session_state.get('alert_failures')
+    while failures:
+        st.toast(f"⚠️ {failures.pop(0)}")
 
 
 # --- Backend Initialization ---
@@ -701,27 +641,204 @@ except ImportError as e:
     st.error(f"Backend import error: {e}")
     backend_available = False
 
-if backend_available:
-    if 'db' not in st.session_state:
-        st.session_state.db = DatabaseManager("data/products.db")
-    if 'notifier' not in st.session_state:
-        st.session_state.notifier = EmailNotifier()
-    if 'scraper' not in st.session_state:
-        st.session_state.scraper = ProductScraper()
+@st.cache_resource(show_spinner=False)
+def get_db():
+    """Shared DatabaseManager, built once per server process"""
+    return DatabaseManager("data/products.db")
+
+@st.cache_resource(show_spinner=False)
+def get_notifier():
+    """Shared EmailNotifier, built once per server process"""
+    return EmailNotifier()
+
+# Browser-like headers for the dashboard's own fetches
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+# First amount following a currency symbol, used by the Add Product fallback
+PRICE_RE = re.compile(r'[₹$€£]\s*(\d[\d,]*(?:\.\d+)?)')
+
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """Keep-alive session shared by every scrape, so repeat hosts skip the TLS handshake"""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32,
+                          max_retries=Retry(total=2, backoff_factor=0.3))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+@st.cache_resource(show_spinner=False)
+def get_scraper():
+    """Shared ProductScraper, built once per server process on the pooled HTTP session"""
+    scraper = ProductScraper()
+    scraper.session.close()
+    scraper.session = get_http_session()
+    return scraper
+
+# aiohttp is optional; without it the quick check falls back to a thread pool
+try:
+    import asyncio
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+async def _fetch_one(session, sem, scraper, url):
+    """
+    Fetch one product page and parse it off the event loop
+
+    Pages that fail to download or come back without a name and price are
+    retried, then handed to the blocking scrape_product() as a last resort.
+    """
+    loop = asyncio.get_running_loop()
+    async with sem:
+        if not scraper.needs_browser(url):
+            for attempt in range(CHECK_PRICES_ATTEMPTS):
+                if attempt:
+                    await asyncio.sleep(CHECK_PRICES_RETRY_DELAY)
+                try:
+                    async with session.get(url, headers=scraper._get_headers(),
+                                           timeout=aiohttp.ClientTimeout(total=10)) as response:
+                        response.raise_for_status()
+                        body = await response.read()
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    print(f"❌ Price check attempt {attempt + 1} failed for {url}: {e}")
+                    continue
+                try:
+                    product_info = await loop.run_in_executor(None, scraper.parse_html, body, url)
+                except Exception as e:
+                    print(f"❌ Could not parse {url}: {e}")
+                    break
+                if product_info and product_info.get('name') and product_info.get('price'):
+                    return url, product_info
+                print(f"⚠️ Price check attempt {attempt + 1}: incomplete data for {url}")
+        
+        # Selenium pages cannot be fetched over plain HTTP; others get the scraper's own retry loop
+        try:
+            return url, await loop.run_in_executor(None, scraper.scrape_product, url)
+        except Exception as e:
+            print(f"❌ Price check failed for {url}: {e}")
+            return url, None
+
+async def _fetch_all(urls, on_progress):
+    """Fetch all URLs over one pooled aiohttp session, reporting each completion"""
+    scraper = get_scraper()
+    sem = asyncio.Semaphore(CHECK_PRICES_WORKERS)
+    connector = aiohttp.TCPConnector(limit=20, ttl_dns_cache=300, keepalive_timeout=60)
+    results = []
+    async with aiohttp.ClientSession(connector=connector) as session:
+        tasks = [_fetch_one(session, sem, scraper, url) for url in urls]
+        for i, task in enumerate(asyncio.as_completed(tasks)):
+            results.append(await task)
+            on_progress(i + 1)
+    return results
+
+def check_prices(urls, on_progress=lambda done: None):
+    """Scrape several product URLs concurrently; returns (url, result) pairs"""
+    if AIOHTTP_AVAILABLE:
+        return asyncio.run(_fetch_all(urls, on_progress))
+
+    scraper = get_scraper()
+    results = []
+    with ThreadPoolExecutor(max_workers=CHECK_PRICES_WORKERS) as executor:
+        futures = {executor.submit(scraper.scrape_product, url): url for url in urls}
+        for i, future in enumerate(as_completed(futures)):
+            results.append((futures[future], future.result()))
+            on_progress(i + 1)
+    return results
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_analytics():
+    """Analytics summary shared by the sidebar and page bodies"""
+    return get_db().get_analytics_data()
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_best_deals(limit=5):
+    """Best deals list, cached per limit"""
+    return get_db().get_best_deals(limit=limit)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_products():
+    """Product list used by every page"""
+    return get_db().get_all_products()
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_products_df():
+    """Product list as a DataFrame with a lowercase name column for searching"""
+    df = pd.DataFrame.from_records(
+        cached_products(),
+        columns=['id', 'name', 'url', 'current_price', 'alert_price', 'category',
+                 'site', 'currency', 'image_url', 'last_updated', 'is_active'],
+    )
+    df['category'] = df['category'].fillna('Other')
+    df['currency'] = df['currency'].fillna('INR')
+    df['name_lower'] = df['name'].str.lower()
+    df['name_short'] = df['name'].str.slice(0, 60)
+    current = df['current_price'].fillna(0)
+    alert = df['alert_price'].fillna(0)
+    df['status'] = np.where((current > 0) & (alert > 0) & (current <= alert), '🔴 ALERT!', '🟢 Active')
+    # Display strings matching format_price(), built per column rather than per row
+    symbols = df['currency'].map(_CURRENCY_SYMBOLS.get).fillna('₹')
+    df['current_fmt'] = np.where(current > 0, symbols + current.map('{:.2f}'.format), 'N/A')
+    df['alert_fmt'] = symbols + alert.map('{:.2f}'.format)
+    return df
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_categories():
+    """Category filter options in a stable, sorted order"""
+    return ["All"] + sorted(cached_products_df()['category'].unique().tolist())
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_price_trend(days=30, buckets=400):
+    """M4-binned price history, per product, for the Dashboard trend chart"""
+    return get_db().get_price_trend_m4(days=days, buckets=buckets)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_price_history(product_id, days):
+    """Price history for one product, shared by the Analytics charts and tables"""
+    return get_db().get_price_history(product_id, days=days)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_price_history_bulk(product_ids, days):
+    """Price history for many products from one query (product_ids must be a tuple)"""
+    return get_db().get_price_history_bulk(list(product_ids), days=days)
+
+def clear_data_caches():
+    """Invalidate cached DB reads after a write"""
+    cached_analytics.clear()
+    cached_best_deals.clear()
+    cached_products.clear()
+    cached_products_df.clear()
+    cached_categories.clear()
+    cached_price_history.clear()
+    cached_price_history_bulk.clear()
+    cached_price_trend.clear()
+    st.session_state.pop('quick_stats', None)
 
 # --- Sidebar ---
+@st.fragment(run_every=60)
+def last_updated():
+    """Timestamp that refreshes on its own without rerunning the page"""
+    st.caption(f"Last updated: {datetime.now().strftime('%H:%M:%S')}")
+
 with st.sidebar:
     # User Profile
     settings = load_settings()
     username = settings.get('username', 'User')
     
-    st.markdown(f"""
-        <div style='text-align: center; margin-bottom: 24px;'>
-            <div class='user-avatar'>{get_user_initials(username)}</div>
-            <h3 style='margin-top: 12px;'>@{username}</h3>
-            <p style='font-size: 0.85rem; opacity: 0.8;'>{settings.get('email_address', '')}</p>
-        </div>
-    """, unsafe_allow_html=True)
+    # Rebuilt only when the profile changes; otherwise reused from this session
+    avatar_key = (username, settings.get('email_address', ''))
+    if st.session_state.get('avatar_key') != avatar_key:
+        st.session_state.avatar_key = avatar_key
+        st.session_state.avatar_html = _avatar_html(*avatar_key)
+    st.markdown(st.session_state.avatar_html, unsafe_allow_html=True)
     
     st.markdown("---")
     
@@ -734,37 +851,45 @@ with st.sidebar:
     st.markdown("---")
     st.subheader("Quick Stats")
     if backend_available:
-        analytics = st.session_state.db.get_analytics_data()
+        # Only the Dashboard queries the DB; other pages reuse the last stats from this session
+        if page == "📊 Dashboard" or 'quick_stats' not in st.session_state:
+            st.session_state.quick_stats = cached_analytics()
+        analytics = st.session_state.quick_stats
         st.metric("Tracked Products", analytics.get('total_products', 0))
         st.metric("Active Alerts", analytics.get('active_alerts', 0))
         st.metric("Avg Price", format_price(analytics.get('avg_price', 0)))
-    st.caption(f"Last updated: {datetime.now().strftime('%H:%M:%S')}")
+    last_updated()
     if st.button("🔄 Refresh Data"):
+        clear_data_caches()
         st.rerun()
+    st.checkbox("Debug mode", key="debug_mode", help="Show full tracebacks on errors")
 
 # --- Main Page ---
-if page == "📊 Dashboard":
+# Each page is a fragment, so its own widgets rerun only that page instead of the whole script
+@st.fragment
+def render_dashboard(username):
+    """Dashboard page: metrics, trend chart, best deals and quick actions"""
     st.markdown("<h1>📊 Price Tracking Dashboard</h1>", unsafe_allow_html=True)
     st.markdown(f"<div class='section-card'><h3>Welcome back, {username}! 👋</h3><p>Here's your price tracking overview</p></div>", unsafe_allow_html=True)
     
     if not backend_available:
         st.error("⚠️ Backend modules not available. Check imports.")
     else:
-        analytics = st.session_state.db.get_analytics_data()
-        best_deals = st.session_state.db.get_best_deals(limit=5)
+        analytics = cached_analytics()
+        best_deals = cached_best_deals(limit=5)
         st.markdown("<br>", unsafe_allow_html=True)
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.markdown(f"<div class='metric-card'><h4>🛍️ Products</h4><div class='big-metric'>{analytics.get('total_products', 0)}</div><span class='badge badge-info'>Active</span></div>", unsafe_allow_html=True)
+            st.metric("🛍️ Products", analytics.get('total_products', 0), delta="Active", delta_color="off")
         with col2:
-            st.markdown(f"<div class='metric-card'><h4>💰 Avg Price</h4><div class='big-metric'>{format_price(analytics.get('avg_price', 0))}</div><span class='badge badge-success'>Updated</span></div>", unsafe_allow_html=True)
+            st.metric("💰 Avg Price", format_price(analytics.get('avg_price', 0)), delta="Updated", delta_color="off")
         with col3:
-            st.markdown(f"<div class='metric-card'><h4>📉 Alerts</h4><div class='big-metric'>{analytics.get('active_alerts', 0)}</div><span class='badge badge-warning'>Watching</span></div>", unsafe_allow_html=True)
+            st.metric("📉 Alerts", analytics.get('active_alerts', 0), delta="Watching", delta_color="off")
         with col4:
             if best_deals:
-                st.markdown(f"<div class='metric-card'><h4>🎯 Best Deal</h4><div class='big-metric'>{best_deals[0]['discount_percent']:.0f}%</div><span class='badge badge-success'>OFF</span></div>", unsafe_allow_html=True)
+                st.metric("🎯 Best Deal", f"{best_deals[0]['discount_percent']:.0f}%", delta="OFF", delta_color="off")
             else:
-                st.markdown(f"<div class='metric-card'><h4>🎯 Best Deal</h4><div class='big-metric'>N/A</div></div>", unsafe_allow_html=True)
+                st.metric("🎯 Best Deal", "N/A")
         
         st.markdown("<br>", unsafe_allow_html=True)
         
@@ -772,43 +897,70 @@ if page == "📊 Dashboard":
         col1, col2 = st.columns([2, 1])
         with col1:
             st.subheader("📈 Price Trends")
-            dates = pd.date_range(start='2025-09-20', periods=30, freq='D')
-            np.random.seed(42)
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=dates,
-                y=np.random.uniform(50, 100, 30),
-                mode='lines+markers',
-                name='Average Price',
-                line=dict(color='#10b981', width=3),
-                marker=dict(size=8, color='#3b82f6')
-            ))
-            fig.update_layout(height=340, template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color='white'))
-            st.plotly_chart(fig, use_container_width=True)
+            # One line per tracked product, most-tracked products first as on the Analytics page
+            names = cached_products_df().set_index('id')['name']
+            trend_df = cached_price_trend(days=30)
+            trend_df = trend_df[trend_df['product_id'].isin(names.index)]
+            top_ids = trend_df.groupby('product_id', sort=False).size().nlargest(ANALYTICS_MAX_TRACES).index
+            trend_df = trend_df[trend_df['product_id'].isin(top_ids)]
+            if trend_df.empty:
+                st.info("No price history yet")
+            elif len(trend_df) >= SCATTERGL_MIN_POINTS:
+                # Long series: downsample each product within a shared budget and draw with Plotly/WebGL
+                budget = LTTB_TARGET_POINTS // len(top_ids)
+                series = tuple(
+                    (names[product_id], *downsample_series(group['timestamp'].to_numpy(), group['price'].to_numpy(), budget))
+                    for product_id, group in trend_df.groupby('product_id', sort=False)
+                )
+                st.plotly_chart(trend_fig(series), use_container_width=True, key='trend_chart')
+            else:
+                st.line_chart(
+                    trend_df.assign(Product=trend_df['product_id'].map(names)),
+                    x='timestamp',
+                    y='price',
+                    color='Product',
+                    height=340
+                )
         with col2:
             st.subheader("💹 Categories")
             if analytics.get('top_categories'):
-                cat_data = pd.DataFrame(
-                    list(analytics['top_categories'].items()),
-                    columns=['Category', 'Count']
-                )
-                fig_pie = px.pie(cat_data, values='Count', names='Category', hole=0.5, color_discrete_sequence=px.colors.sequential.Teal)
-                fig_pie.update_layout(height=340, template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', font=dict(color='white'))
-                st.plotly_chart(fig_pie, use_container_width=True)
+                fig_pie = category_pie(tuple(analytics['top_categories'].items()))
+                st.plotly_chart(fig_pie, use_container_width=True, key='category_pie')
             else:
                 st.info("No categories yet")
         
         st.markdown("<br>", unsafe_allow_html=True)
         st.subheader("🔥 Hot Deals Right Now")
         if best_deals:
-            deals_df = pd.DataFrame([{
-                '🏷️ Product': deal['name'],
-                '💰 Current': format_price(deal['current_price'], deal.get('currency', 'INR')),
-                '💸 Alert Price': format_price(deal['alert_price'], deal.get('currency', 'INR')),
-                '📊 Savings': f"{format_price(deal['alert_price'] - deal['current_price'], deal.get('currency', 'INR'))} ({deal['discount_percent']:.0f}% OFF)",
-                '🛒 Site': deal.get('site', 'N/A')
-            } for deal in best_deals])
-            st.dataframe(deals_df, width='stretch', hide_index=True)
+            deals = pd.DataFrame.from_records(
+                best_deals,
+                columns=['name', 'current_price', 'alert_price', 'discount_percent', 'site', 'currency'],
+            )
+            current = deals['current_price'].fillna(0).astype('float64')
+            alert = deals['alert_price'].fillna(0).astype('float64')
+            # Typed columns go to Arrow as-is; NumberColumn handles display and keeps them sortable
+            deals_df = pd.DataFrame({
+                '🏷️ Product': deals['name'].astype('string'),
+                '💰 Current': current,
+                '💸 Alert Price': alert,
+                '📊 Savings': alert - current,
+                '🔻 Discount': deals['discount_percent'].astype('float32'),
+                '🛒 Site': deals['site'].fillna('N/A').astype('string'),
+            })
+            # Deals without a currency fall back to INR, like format_price()
+            symbols = deals['currency'].map(_CURRENCY_SYMBOLS.get).fillna('₹').unique()
+            price_format = f"{symbols[0]}%.2f" if len(symbols) == 1 else "%.2f"
+            st.dataframe(
+                deals_df,
+                width='stretch',
+                hide_index=True,
+                column_config={
+                    '💰 Current': st.column_config.NumberColumn(format=price_format),
+                    '💸 Alert Price': st.column_config.NumberColumn(format=price_format),
+                    '📊 Savings': st.column_config.NumberColumn(format=price_format),
+                    '🔻 Discount': st.column_config.ProgressColumn(format="%.0f%%", min_value=0, max_value=100),
+                },
+            )
         else:
             st.info("No deals available yet. Add products to track!")
         
@@ -817,77 +969,82 @@ if page == "📊 Dashboard":
         with col1:
             if st.button("📧 Send Daily Report"):
                 try:
-                    products = st.session_state.db.get_all_products()
-                    st.session_state.notifier.send_daily_report(products)
+                    products = cached_products()
+                    get_notifier().send_daily_report(products)
                     st.success("Daily report sent!")
                 except Exception as e:
                     st.error(f"Error: {e}")
         with col2:
             if st.button("📊 Export to CSV"):
                 try:
-                    st.session_state.db.export_to_csv("data/price_export.csv")
+                    get_db().export_to_csv("data/price_export.csv")
                     st.success("Data exported to data/price_export.csv")
                 except Exception as e:
                     st.error(f"Error: {e}")
         with col3:
             if st.button("🔄 Check Prices Now"):
                 with st.spinner("Checking prices..."):
-                    products = st.session_state.db.get_all_products()
-                    checked = 0
+                    urls = [p['url'] for p in cached_products()[:3]]
                     progress = st.progress(0)
-                    for i, product in enumerate(products[:3]):
-                        result = st.session_state.scraper.scrape_product(product['url'])
-                        if result:
-                            st.session_state.db.update_price(product['url'], result['price'])
-                            checked += 1
-                        progress.progress((i + 1) / min(3, len(products)))
+                    # Scrapes are network-bound, so run them side by side and save afterwards
+                    results = check_prices(urls, lambda done: progress.progress(done / len(urls)))
+                    updates = [(url, result['price']) for url, result in results
+                               if result and result.get('price')]
+                    checked = get_db().bulk_update_price(updates)
+                    if checked:
+                        clear_data_caches()
                     st.success(f"Checked {checked} products!")
 
-elif page == "📦 Products":
+
+@st.fragment
+def render_products():
+    """Products page: add form and the tracked products table"""
+    show_alert_failures()
     st.markdown("<h1>📦 Product Management</h1>", unsafe_allow_html=True)
     if not backend_available:
         st.error("⚠️ Backend not available")
     else:
         with st.expander("➕ Add New Product", expanded=False):
-            col1, col2 = st.columns(2)
+            # A form batches the field edits into one rerun on submit
+            with st.form("add_product", border=False):
+                col1, col2 = st.columns(2)
             
-            with col1:
-                product_name = st.text_input("Product Name", placeholder="e.g., iPhone 15 Pro")
-                product_url = st.text_input("Product URL", placeholder="https://...")
-                # Per-product currency selection
-                product_currency = st.selectbox("Currency", ["INR", "USD", "EUR", "GBP"], index=0)
-                currency_symbols = {'USD': '$', 'EUR': '€', 'GBP': '£', 'INR': '₹'}
-                currency_symbol = currency_symbols.get(product_currency, '₹')
-                alert_price = st.number_input(f"Alert Price ({currency_symbol})", min_value=0.0, value=1000.0)
+                with col1:
+                    product_name = st.text_input("Product Name", placeholder="e.g., iPhone 15 Pro")
+                    product_url = st.text_input("Product URL", placeholder="https://...")
+                    # Per-product currency selection
+                    product_currency = st.selectbox("Currency", ["INR", "USD", "EUR", "GBP"], index=0)
+                    alert_price = st.number_input("Alert Price", min_value=0.0, value=1000.0)
             
-            with col2:
+                with col2:
                 
-                sites = st.multiselect(
-                    "Sites to Track",
-                    ["Amazon", "Flipkart", "eBay", "Meesho", "Myntra"],
-                    default=["Flipkart"]
-                )
+                    sites = st.multiselect(
+                        "Sites to Track",
+                        ["Amazon", "Flipkart", "eBay", "Meesho", "Myntra"],
+                        default=["Flipkart"]
+                    )
 
-                category = st.selectbox(
-                    "Category",
-                    ["Electronics", "Fashion", "Home", "Books", "Sports", "Gaming", "Beauty", "Other"]
-                )
-                enable_alerts = st.checkbox("Enable Price Alerts", value=True)
+                    category = st.selectbox(
+                        "Category",
+                        ["Electronics", "Fashion", "Home", "Books", "Sports", "Gaming", "Beauty", "Other"]
+                    )
+                    enable_alerts = st.checkbox("Enable Price Alerts", value=True)
             
-            st.markdown("---")
+                st.markdown("---")
             
-            # Small centered Add Product button
-            col1, col2, col3 = st.columns([2, 1, 2])
-            with col2:
-                add_button = st.button("✨ Add", type="primary", width='stretch')
+                # Small centered Add Product button
+                col1, col2, col3 = st.columns([2, 1, 2])
+                with col2:
+                    add_button = st.form_submit_button("✨ Add", type="primary", width='stretch')
             
+            currency_symbol = _CURRENCY_SYMBOLS.get(product_currency, '₹')
             if add_button:
                 if product_name and product_url:
                     with st.spinner("🔍 Fetching product details and saving..."):
                         try:
                             # Step 1: Scrape product from URL with better error handling
                             st.info("🔍 Attempting to fetch product details...")
-                            result = st.session_state.scraper.scrape_product(product_url)
+                            result = get_scraper().scrape_product(product_url)
                 
                             # Initialize fields
                             current_price, image_url = None, None
@@ -904,36 +1061,14 @@ elif page == "📦 Products":
                                 
                                 # Method 1: Try with different user agent
                                 try:
-                                    import requests
-                                    from bs4 import BeautifulSoup
-                                    
-                                    headers = {
-                                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                                        'Accept-Language': 'en-US,en;q=0.5',
-                                        'Accept-Encoding': 'gzip, deflate',
-                                        'Connection': 'keep-alive',
-                                    }
-                                    
-                                    response = requests.get(product_url, headers=headers, timeout=10)
+                                    response = get_http_session().get(product_url, timeout=10)
                                     if response.status_code == 200:
-                                        soup = BeautifulSoup(response.content, 'html.parser')
-                                        
-                                        # Try to extract price using generic methods
-                                        price_text = None
-                                        for elem in soup.find_all(string=lambda text: text and ('₹' in text or '$' in text or '€' in text or '£' in text)):
-                                            if any(char.isdigit() for char in elem):
-                                                price_text = elem.strip()
-                                                break
-                                        
-                                        if price_text:
-                                            # Simple price extraction
-                                            import re
-                                            numbers = re.findall(r'[\d,]+\.?\d*', price_text.replace(',', ''))
-                                            if numbers:
-                                                current_price = float(numbers[0])
-                                                scraping_success = True
-                                                st.success(f"✅ Alternative method found price: {currency_symbol}{current_price}")
+                                        # First currency-prefixed amount in the raw page, no DOM walk
+                                        match = PRICE_RE.search(response.text)
+                                        if match:
+                                            current_price = float(match.group(1).replace(',', ''))
+                                            scraping_success = True
+                                            st.success(f"✅ Alternative method found price: {currency_symbol}{current_price}")
                                 
                                 except Exception as e:
                                     st.warning(f"⚠️ Alternative scraping also failed: {str(e)}")
@@ -944,7 +1079,7 @@ elif page == "📦 Products":
                             
                             # Step 2: Add to database (only if scraping was successful)
                             if scraping_success and current_price:
-                                success = st.session_state.db.add_product(
+                                success = get_db().add_product(
                                     name=product_name,
                                     url=product_url,
                                     alert_price=alert_price,
@@ -956,6 +1091,7 @@ elif page == "📦 Products":
                                 )
                                 
                                 if success:
+                                    clear_data_caches()
                                     st.success(f"✅ Added '{product_name}' with current price {currency_symbol}{current_price}!")
                             
                                     # 🚨 CHECK AND SEND INSTANT ALERT
@@ -964,9 +1100,8 @@ elif page == "📦 Products":
                                         savings = alert_price - current_price
                                         savings_pct = (savings / alert_price) * 100 if alert_price > 0 else 0
                                         
-                                        # Send instant alert
-                                        with st.spinner("🚨 Sending instant alert..."):
-                                            send_price_alert(product_name, current_price, alert_price, product_url, product_currency)
+                                        # Send instant alert without blocking the page
+                                        send_price_alert_async(product_name, current_price, alert_price, product_url, product_currency)
                                         
                                         # Show prominent alert message
                                         st.markdown(f"""
@@ -978,7 +1113,7 @@ elif page == "📦 Products":
                                                 <span style="font-size: 20px; font-weight: bold;">You Save: {currency_symbol}{savings:.2f} ({savings_pct:.1f}% OFF!)</span>
                                             </p>
                                             <p style="margin: 0; font-size: 14px; opacity: 0.9;">
-                                                Email and Telegram notifications sent immediately!
+                                                Email and Telegram notifications are on their way!
                                             </p>
                                         </div>
                                         """, unsafe_allow_html=True)
@@ -988,16 +1123,6 @@ elif page == "📦 Products":
                                     st.error("❌ Product already exists in database!")
                             else:
                                 st.error("❌ Cannot add product without current price. Please ensure the URL is correct and try again.")
-
-                    
-                                # Progress animation like Check Prices Now
-                                progress = st.progress(0)
-                                for i in range(100):
-                                    time.sleep(0.005)
-                                    progress.progress(i + 1)
-                    
-                                time.sleep(0.5)
-                                st.rerun()
                     
                         except Exception as e:
                             st.error(f"⚠️ Error occurred: {str(e)}")
@@ -1006,79 +1131,102 @@ elif page == "📦 Products":
 
         
         st.subheader("📋 Your Tracked Products")
-        products = st.session_state.db.get_all_products()
+        products_df = cached_products_df()
         
-        if products:
+        if not products_df.empty:
             # Search and Filter
             col1, col2, col3 = st.columns(3)
             with col1:
                 search = st.text_input("🔍 Search products", placeholder="Search by name...")
             with col2:
-                filter_cat = st.selectbox("Filter by Category", ["All"] + list(set(p.get('category', 'Other') for p in products)))
+                filter_cat = st.selectbox("Filter by Category", cached_categories())
             with col3:
                 sort_by = st.selectbox("Sort by", ["Latest", "Price (Low to High)", "Price (High to Low)", "Name"])
             
-            # Apply filters
-            filtered_products = products
+            # Apply filters (rows arrive newest first, so "Latest" keeps that order)
+            mask = np.ones(len(products_df), dtype=bool)
             if search:
-                filtered_products = [p for p in filtered_products if search.lower() in p['name'].lower()]
+                mask &= products_df['name_lower'].str.contains(search.lower(), regex=False, na=False).to_numpy()
             if filter_cat != "All":
-                filtered_products = [p for p in filtered_products if p.get('category') == filter_cat]
+                mask &= products_df['category'].eq(filter_cat).to_numpy()
+            filtered_df = products_df[mask]
+            if sort_by == "Price (Low to High)":
+                filtered_df = filtered_df.sort_values('current_price', na_position='last')
+            elif sort_by == "Price (High to Low)":
+                filtered_df = filtered_df.sort_values('current_price', ascending=False, na_position='last')
+            elif sort_by == "Name":
+                filtered_df = filtered_df.sort_values('name_lower')
+            filtered_df = filtered_df.reset_index(drop=True)
             
-            # Display products with images
-            for product in filtered_products:
-                product_currency = product.get('currency', 'INR')
-                status = '🔴 ALERT!' if (product.get('current_price') and product.get('alert_price') and 
-                                        product['current_price'] <= product['alert_price']) else '🟢 Active'
-                
-                col_img, col_content = st.columns([1, 4])
-                
-                with col_img:
-                    if product.get('image_url'):
-                        st.image(product['image_url'], width=100)
-                    else:
-                        st.markdown("<div style='width:100px;height:100px;background:#1a2742;border-radius:8px;display:flex;align-items:center;justify-content:center;'>📦</div>", unsafe_allow_html=True)
-                
-                with col_content:
-                    st.markdown(f"""
-                        <div class='metric-card'>
-                            <h3 style='margin: 0 0 8px 0;'>{product['name'][:60]}</h3>
-                            <p style='margin: 4px 0; opacity: 0.8;'>
-                                <strong>Current:</strong> {format_price(product.get('current_price'), product_currency) if product.get('current_price') else 'N/A'} | 
-                                <strong>Alert:</strong> {format_price(product.get('alert_price'), product_currency)}
-                            </p>
-                            <p style='margin: 4px 0; font-size: 0.85rem;'>
-                                <span class='badge badge-info'>{product.get('category', 'Other')}</span>
-                                <span class='badge badge-info'>{product.get('site', 'N/A')}</span>
-                                <span class='badge {"badge-danger" if "ALERT" in status else "badge-success"}'>{status}</span>
-                            </p>
-                        </div>
-                    """, unsafe_allow_html=True)
-                
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    if st.button("🔍 View", key=f"view_{product['id']}", width='stretch'):
-                        st.info(f"URL: {product['url']}")
-                with col2:
-                    if st.button("🔄 Update Price", key=f"update_{product['id']}", width='stretch'):
-                        with st.spinner("Updating..."):
-                            result = st.session_state.scraper.scrape_product(product['url'])
-                            if result and result.get('price'):
-                                st.session_state.db.update_price(product['url'], result['price'])
-                                st.success(f"✅ Updated to {format_price(result['price'], product_currency)}")
-                                time.sleep(1)
+            # One table for all products instead of a card and button row per product
+            if not filtered_df.empty:
+                display_df = pd.DataFrame({
+                    'Image': filtered_df['image_url'],
+                    'Product': filtered_df['name_short'],
+                    'Current': filtered_df['current_fmt'],
+                    'Alert': filtered_df['alert_fmt'],
+                    'Category': filtered_df['category'],
+                    'Site': filtered_df['site'].fillna('N/A'),
+                    'Status': filtered_df['status'],
+                })
+                column_config = {'Image': st.column_config.ImageColumn("Image", width="small")}
+                currencies = filtered_df['currency'].unique()
+                if len(currencies) == 1:
+                    # One currency: keep prices numeric so the table sorts them as numbers
+                    price_format = _CURRENCY_SYMBOLS.get(currencies[0], '₹') + '%.2f'
+                    display_df['Current'] = filtered_df['current_price'].where(filtered_df['current_price'] > 0)
+                    display_df['Alert'] = filtered_df['alert_price'].fillna(0)
+                    column_config['Current'] = st.column_config.NumberColumn("Current", format=price_format)
+                    column_config['Alert'] = st.column_config.NumberColumn("Alert", format=price_format)
+                event = st.dataframe(
+                    display_df,
+                    hide_index=True,
+                    width='stretch',
+                    on_select="rerun",
+                    selection_mode="single-row",
+                    column_config=column_config,
+                )
+
+                selected_rows = event.selection.rows
+                if selected_rows:
+                    product = filtered_df.iloc[selected_rows[0]].to_dict()
+                    product_currency = product['currency']
+
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        if st.button("🔍 View", key=f"view_{product['id']}", width='stretch'):
+                            st.info(f"URL: {product['url']}")
+                    with col2:
+                        if st.button("🔄 Update Price", key=f"update_{product['id']}", width='stretch'):
+                            with st.spinner("Updating..."):
+                                result = get_scraper().scrape_product(product['url'])
+                                if result and result.get('price'):
+                                    get_db().update_price(product['url'], result['price'])
+                                    clear_data_caches()
+                                    # A toast survives the rerun, so no pause is needed to show it
+                                    st.toast(f"✅ Updated to {format_price(result['price'], product_currency)}")
+                                    st.rerun()
+                    with col3:
+                        if st.button("🗑️ Delete", key=f"delete_{product['id']}", width='stretch'):
+                            if get_db().delete_product(int(product['id'])):
+                                clear_data_caches()
+                                st.toast("✅ Deleted!")
                                 st.rerun()
-                with col3:
-                    if st.button("🗑️ Delete", key=f"delete_{product['id']}", width='stretch'):
-                        if st.session_state.db.delete_product(product['id']):
-                            st.success("✅ Deleted!")
-                            time.sleep(0.5)
-                            st.rerun()
+                else:
+                    st.caption("Select a product row to view, update or delete it.")
+            else:
+                st.info("🔍 No products match your filters.")
         else:
             st.info("📭 No products yet. Add one above!")
 
 
-elif page == "📈 Analytics":
+
+@st.fragment
+def render_analytics():
+    """Analytics page: price history charts and statistics"""
+    # Plotly is imported by the pages that draw with it, so other pages never load it
+    import plotly.graph_objects as go
+    import plotly.express as px
     st.markdown("<h1>📈 Price Analytics & Insights</h1>", unsafe_allow_html=True)
     
     if not backend_available:
@@ -1096,97 +1244,68 @@ elif page == "📈 Analytics":
         days = days_map[time_range]
         
         # Get analytics data
-        analytics = st.session_state.db.get_analytics_data()
-        products = st.session_state.db.get_all_products()
+        analytics = cached_analytics()
+        products = cached_products()
         
         if not products:
             st.info("📭 No products to analyze yet. Add some products first!")
         else:
-            # Overview metrics
-            st.markdown("<br>", unsafe_allow_html=True)
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.markdown(f"""
-                    <div class='metric-card'>
-                        <h4>📊 Total Products</h4>
-                        <div class='big-metric'>{analytics.get('total_products', 0)}</div>
-                        <span class='badge badge-info'>Tracked</span>
-                    </div>
-                """, unsafe_allow_html=True)
-            
-            with col2:
-                avg_price = analytics.get('avg_price', 0)
-                st.markdown(f"""
-                    <div class='metric-card'>
-                        <h4>💰 Avg Price</h4>
-                        <div class='big-metric'>{format_price(avg_price)}</div>
-                        <span class='badge badge-success'>Current</span>
-                    </div>
-                """, unsafe_allow_html=True)
-            
-            with col3:
-                active_alerts = analytics.get('active_alerts', 0)
-                st.markdown(f"""
-                    <div class='metric-card'>
-                        <h4>🔔 Active Alerts</h4>
-                        <div class='big-metric'>{active_alerts}</div>
-                        <span class='badge badge-warning'>Watching</span>
-                    </div>
-                """, unsafe_allow_html=True)
-            
-            with col4:
-                best_deals = st.session_state.db.get_best_deals(limit=1)
-                if best_deals:
-                    discount = best_deals[0]['discount_percent']
-                    st.markdown(f"""
-                        <div class='metric-card'>
-                            <h4>🎯 Best Deal</h4>
-                            <div class='big-metric'>{discount:.0f}%</div>
-                            <span class='badge badge-success'>OFF</span>
-                        </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                        <div class='metric-card'>
-                            <h4>🎯 Best Deal</h4>
-                            <div class='big-metric'>N/A</div>
-                            <span class='badge badge-info'>None</span>
-                        </div>
-                    """, unsafe_allow_html=True)
-            
-            st.markdown("<br>", unsafe_allow_html=True)
+            # Overview metrics, all four cards in one markdown element
+            best_deals = cached_best_deals(limit=1)
+            if best_deals:
+                best_deal = dict(value=f"{best_deals[0]['discount_percent']:.0f}%", badge='success', label='OFF')
+            else:
+                best_deal = dict(value='N/A', badge='info', label='None')
+            cards = [
+                _METRIC_CARD_TPL.substitute(title='📊 Total Products', value=analytics.get('total_products', 0),
+                                            badge='info', label='Tracked'),
+                _METRIC_CARD_TPL.substitute(title='💰 Avg Price', value=format_price(analytics.get('avg_price', 0)),
+                                            badge='success', label='Current'),
+                _METRIC_CARD_TPL.substitute(title='🔔 Active Alerts', value=analytics.get('active_alerts', 0),
+                                            badge='warning', label='Watching'),
+                _METRIC_CARD_TPL.substitute(title='🎯 Best Deal', **best_deal),
+            ]
+            st.markdown(f"<div class='metric-grid'>{''.join(cards)}</div>", unsafe_allow_html=True)
             
             # Price trends chart
             st.subheader("📈 Price Trends Over Time")
             
-            # Get price history for all products
-            all_price_data = []
-            for product in products:
-                history_df = st.session_state.db.get_price_history(product['id'], days=days)
-                if not history_df.empty:
-                    for _, record in history_df.iterrows():
-                        all_price_data.append({
-                            'timestamp': record['timestamp'],
-                            'price': record['price'],
-                            'product_name': product['name'],
-                            'site': product['site']
-                        })
+            # Get price history for all products in one query, then attach names and sites
+            products_df = cached_products_df()
+            history = cached_price_history_bulk(tuple(products_df['id'].tolist()), days)
+            df_prices = history.merge(
+                products_df[['id', 'name', 'site']], left_on='product_id', right_on='id'
+            ).drop(columns='id').rename(columns={'name': 'product_name'})
+            # Names and sites repeat on every history row; store them as small integer codes
+            df_prices = df_prices.astype({'product_name': 'category', 'site': 'category'})
             
-            if all_price_data:
-                df_prices = pd.DataFrame(all_price_data)
+            if not df_prices.empty:
                 
                 # Create interactive price trends chart
                 fig = go.Figure()
                 
-                # Add traces for each product
-                for product_name in df_prices['product_name'].unique():
-                    product_data = df_prices[df_prices['product_name'] == product_name]
+                # Plot the products with the most history, each downsampled to a fixed budget
+                points = df_prices.groupby('product_id', sort=False)['price'].size()
+                top_ids = points.nlargest(ANALYTICS_MAX_TRACES).index
+                df_top = df_prices[df_prices['product_id'].isin(top_ids)]
+                
+                # Add traces for each product; groupby partitions the frame in one pass
+                # (rows arrive ordered by product and timestamp)
+                traces = []
+                for _, product_data in df_top.groupby('product_id', sort=False):
+                    xs, ys = downsample_series(
+                        product_data['timestamp'].to_numpy(),
+                        product_data['price'].to_numpy(),
+                        ANALYTICS_TRACE_POINTS,
+                    )
+                    traces.append((product_data['product_name'].iat[0], xs, ys))
+                mode = 'lines' if sum(len(ys) for _, _, ys in traces) > MARKERS_MAX_POINTS else 'lines+markers'
+                for name, xs, ys in traces:
                     fig.add_trace(go.Scatter(
-                        x=product_data['timestamp'],
-                        y=product_data['price'],
-                        mode='lines+markers',
-                        name=product_name,
+                        x=xs,
+                        y=ys,
+                        mode=mode,
+                        name=name,
                         line=dict(width=2),
                         marker=dict(size=6)
                     ))
@@ -1210,17 +1329,21 @@ elif page == "📈 Analytics":
                 )
                 
                 st.plotly_chart(fig, use_container_width=True)
+                if len(points) > ANALYTICS_MAX_TRACES:
+                    st.caption(f"Showing the {ANALYTICS_MAX_TRACES} products with the most price history "
+                               f"out of {len(points)}.")
                 
                 # Price statistics
                 st.subheader("📊 Price Statistics")
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    # Price distribution
-                    fig_hist = px.histogram(
-                        df_prices, 
-                        x='price', 
-                        nbins=20,
+                    # Price distribution, binned here so only 20 bars are sent instead of every price
+                    counts, edges = np.histogram(df_prices['price'].to_numpy(), bins=20)
+                    fig_hist = px.bar(
+                        x=(edges[:-1] + edges[1:]) / 2,
+                        y=counts,
+                        labels={'x': 'price', 'y': 'count'},
                         title="Price Distribution",
                         color_discrete_sequence=['#3b82f6']
                     )
@@ -1229,13 +1352,15 @@ elif page == "📈 Analytics":
                         paper_bgcolor='rgba(0,0,0,0)',
                         plot_bgcolor='rgba(0,0,0,0)',
                         font=dict(color='white'),
-                        height=400
+                        height=400,
+                        bargap=0
                     )
-                    st.plotly_chart(fig_hist, use_container_width=True)
+                    # Static summaries: no hover/zoom handlers to set up in the browser
+                    st.plotly_chart(fig_hist, use_container_width=True, config={'staticPlot': True})
                 
                 with col2:
                     # Site comparison
-                    site_stats = df_prices.groupby('site')['price'].agg(['mean', 'count']).reset_index()
+                    site_stats = df_prices.groupby('site', observed=True)['price'].agg(['mean', 'count']).reset_index()
                     site_stats.columns = ['Site', 'Avg Price', 'Data Points']
                     
                     fig_bar = px.bar(
@@ -1253,33 +1378,37 @@ elif page == "📈 Analytics":
                         font=dict(color='white'),
                         height=400
                     )
-                    st.plotly_chart(fig_bar, use_container_width=True)
+                    st.plotly_chart(fig_bar, use_container_width=True, config={'staticPlot': True})
                 
                 # Detailed analytics table
                 st.subheader("📋 Detailed Analytics")
                 
-                # Calculate price changes for each product
-                analytics_data = []
-                for product in products:
-                    history_df = st.session_state.db.get_price_history(product['id'], days=days)
-                    if not history_df.empty and len(history_df) >= 2:
-                        current_price = history_df.iloc[-1]['price']
-                        previous_price = history_df.iloc[0]['price']
-                        price_change = current_price - previous_price
-                        price_change_pct = (price_change / previous_price) * 100 if previous_price > 0 else 0
-                        
-                        analytics_data.append({
-                            'Product': product['name'],
-                            'Current Price': format_price(current_price),
-                            'Price Change': format_price(price_change),
-                            'Change %': f"{price_change_pct:+.1f}%",
-                            'Data Points': len(history_df),
-                            'Site': product['site'],
-                            'Status': '📈 Up' if price_change > 0 else '📉 Down' if price_change < 0 else '➡️ Stable'
-                        })
+                # Calculate price changes for each product (history is ordered by timestamp)
+                detail = df_prices.groupby('product_id', sort=False).agg(
+                    name=('product_name', 'first'),
+                    previous_price=('price', 'first'),
+                    current_price=('price', 'last'),
+                    points=('price', 'size'),
+                    site=('site', 'first'),
+                )
+                detail = detail[detail['points'] >= 2].reset_index(drop=True)
                 
-                if analytics_data:
-                    analytics_df = pd.DataFrame(analytics_data)
+                if not detail.empty:
+                    price_change = detail['current_price'] - detail['previous_price']
+                    previous = detail['previous_price'].where(detail['previous_price'] > 0)
+                    price_change_pct = (price_change / previous * 100).fillna(0)
+                    # Same output as format_price(), whose default currency is INR
+                    symbol = _CURRENCY_SYMBOLS['INR']
+                    
+                    analytics_df = pd.DataFrame({
+                        'Product': detail['name'],
+                        'Current Price': symbol + detail['current_price'].map('{:.2f}'.format),
+                        'Price Change': symbol + price_change.map('{:.2f}'.format),
+                        'Change %': price_change_pct.map('{:+.1f}%'.format),
+                        'Data Points': detail['points'],
+                        'Site': detail['site'],
+                        'Status': np.select([price_change > 0, price_change < 0], ['📈 Up', '📉 Down'], '➡️ Stable'),
+                    })
                     st.dataframe(analytics_df, use_container_width=True, hide_index=True)
                 else:
                     st.info("Not enough price history data for detailed analytics")
@@ -1289,41 +1418,74 @@ elif page == "📈 Analytics":
                 
                 # Show products without price history
                 st.subheader("📦 Products Without Price History")
-                products_without_history = []
-                for product in products:
-                    history_df = st.session_state.db.get_price_history(product['id'], days=days)
-                    if history_df.empty:
-                        products_without_history.append(product)
+                with_history = set(history['product_id'])
+                products_without_history = [p for p in products if p['id'] not in with_history]
                 
                 if products_without_history:
-                    for product in products_without_history:
-                        st.markdown(f"""
-                            <div class='product-card'>
-                                <h4>{product['name']}</h4>
-                                <p>Current Price: {format_price(product['current_price'])}</p>
-                                <p>Site: {product['site']}</p>
-                                <p><em>No price history data available</em></p>
-                            </div>
-                        """, unsafe_allow_html=True)
+                    # All cards go out in a single markdown element
+                    st.markdown("".join(
+                        _PRODUCT_CARD_TPL.substitute(
+                            name=product['name'],
+                            price=format_price(product['current_price']),
+                            site=product['site'],
+                        )
+                        for product in products_without_history
+                    ), unsafe_allow_html=True)
                 else:
                     st.success("✅ All products have price history data!")
 
-elif page == "🤖 AI Predictions":
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_forecast(history, product_id, model_type, days):
+    """
+    Train a model on the price history and forecast the next days
+
+    Keyed on the history contents, so pressing the button again with the
+    same data and settings reuses the earlier run instead of refitting.
+    """
+    from ml.price_predictor import PricePredictor
+    predictor = PricePredictor(model_type=model_type)
+    metrics = predictor.train(history, product_id)
+    if 'error' in metrics:
+        return {'metrics': metrics}
+
+    predictions = predictor.predict_next_days(history.tail(30), days=days)  # Use last 30 days for prediction
+    forecast = {'metrics': metrics, 'predictions': predictions}
+    if 'predictions' in predictions:
+        forecast['recommendation'] = predictor.get_buy_recommendation(predictions['predictions'], history['price'].iat[-1])
+        forecast['importance'] = predictor.get_feature_importance()
+    return forecast
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def cached_trend_stats(prices):
+    """Trend direction, volatility and support/resistance levels for a price series"""
+    from ml.price_predictor import TrendAnalyzer
+    return (
+        TrendAnalyzer.detect_trend(prices),
+        TrendAnalyzer.calculate_volatility(prices),
+        TrendAnalyzer.find_support_resistance(prices),
+    )
+
+@st.fragment
+def render_predictions():
+    """AI Predictions page: price forecast and buy recommendation"""
+    import plotly.graph_objects as go
+    import plotly.express as px
     st.markdown("<h1>🤖 AI-Powered Predictions</h1>", unsafe_allow_html=True)
     
     if not backend_available:
         st.error("⚠️ Backend modules not available. Check imports.")
     else:
-        # Import ML modules
+        # Import ML modules (the helpers above take what they need from sys.modules)
         try:
-            from ml.price_predictor import PricePredictor, TrendAnalyzer
+            importlib.import_module("ml.price_predictor")
             ml_available = True
         except ImportError as e:
             st.error(f"ML modules not available: {e}")
             ml_available = False
         
         if ml_available:
-            products = st.session_state.db.get_all_products()
+            products = cached_products()
             
             if not products:
                 st.info("📭 No products to analyze yet. Add some products first!")
@@ -1339,7 +1501,7 @@ elif page == "🤖 AI Predictions":
                 st.markdown(f"**Selected:** {selected_product_name}")
                 
                 # Get price history for selected product
-                price_history_df = st.session_state.db.get_price_history(selected_product['id'], days=90)
+                price_history_df = cached_price_history(selected_product['id'], 90)
                 
                 if len(price_history_df) < 10:
                     st.warning(f"⚠️ Insufficient price history data ({len(price_history_df)} points). Need at least 10 data points for reliable predictions.")
@@ -1350,23 +1512,26 @@ elif page == "🤖 AI Predictions":
                     # Convert to DataFrame for ML (already a DataFrame)
                     df_history = price_history_df.copy()
                     df_history = df_history.sort_values('timestamp')
+                    # Latest observation, reused by the forecast chart and table
+                    last_ts = df_history['timestamp'].to_numpy()[-1]
+                    last_price = float(df_history['price'].iat[-1])
                     
-                    # Prediction parameters
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        prediction_days = st.slider("Prediction Horizon (days)", 1, 30, 7, help="Number of days to predict ahead")
-                    with col2:
-                        model_type = st.selectbox("ML Model", ["random_forest", "linear_regression"], help="Choose the machine learning model")
+                    # Prediction parameters; inside a form so adjusting them does not rerun the page until submitted
+                    with st.form("prediction_params", border=False):
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            prediction_days = st.slider("Prediction Horizon (days)", 1, 30, 7, help="Number of days to predict ahead")
+                        with col2:
+                            model_type = st.selectbox("ML Model", ["random_forest", "linear_regression"], help="Choose the machine learning model")
+                        generate = st.form_submit_button("🔮 Generate Predictions", type="primary")
                     
                     # Train model and make predictions
-                    if st.button("🔮 Generate Predictions", type="primary"):
+                    if generate:
                         with st.spinner("Training ML model and generating predictions..."):
                             try:
-                                # Initialize predictor
-                                predictor = PricePredictor(model_type=model_type)
-                                
-                                # Train model
-                                training_metrics = predictor.train(df_history, selected_product['id'])
+                                # Train model and forecast (cached per history, model and horizon)
+                                forecast = cached_forecast(df_history, selected_product['id'], model_type, prediction_days)
+                                training_metrics = forecast['metrics']
                                 
                                 if 'error' in training_metrics:
                                     st.error(f"Training failed: {training_metrics['error']}")
@@ -1384,35 +1549,33 @@ elif page == "🤖 AI Predictions":
                                     with col4:
                                         st.metric("Test MAE", f"₹{training_metrics['test_mae']:.2f}")
                                     
-                                    # Generate predictions
-                                    recent_data = df_history.tail(30)  # Use last 30 days for prediction
-                                    predictions = predictor.predict_next_days(recent_data, days=prediction_days)
+                                    # Generated predictions
+                                    predictions = forecast['predictions']
                                     
                                     if 'predictions' in predictions:
                                         # Display predictions
                                         st.subheader("🔮 Price Predictions")
                                         
                                         # Create prediction chart
-                                        fig = go.Figure()
-                                        
-                                        # Historical data
-                                        fig.add_trace(go.Scatter(
-                                            x=df_history['timestamp'],
-                                            y=df_history['price'],
+                                        # Historical data, LTTB-reduced when the history is long
+                                        hist_x, hist_y = downsample_series(df_history['timestamp'].to_numpy(), df_history['price'].to_numpy())
+                                        traces = [scatter_trace(len(hist_x))(
+                                            x=hist_x,
+                                            y=hist_y,
                                             mode='lines+markers',
                                             name='Historical Prices',
                                             line=dict(color='#3b82f6', width=2),
                                             marker=dict(size=6)
-                                        ))
+                                        )]
                                         
                                         # Predictions
                                         future_dates = pd.date_range(
-                                            start=df_history['timestamp'].iloc[-1] + timedelta(days=1),
+                                            start=last_ts + np.timedelta64(1, 'D'),
                                             periods=prediction_days,
                                             freq='D'
                                         )
                                         
-                                        fig.add_trace(go.Scatter(
+                                        traces.append(go.Scatter(
                                             x=future_dates,
                                             y=predictions['predictions'],
                                             mode='lines+markers',
@@ -1423,10 +1586,11 @@ elif page == "🤖 AI Predictions":
                                         
                                         # Confidence intervals
                                         if 'confidence_intervals' in predictions:
-                                            upper_bound = [p + predictions['confidence_intervals'][i] for i, p in enumerate(predictions['predictions'])]
-                                            lower_bound = [p - predictions['confidence_intervals'][i] for i, p in enumerate(predictions['predictions'])]
+                                            # Each interval is a (lower, upper) pair around its prediction
+                                            ci = np.asarray(predictions['confidence_intervals'], dtype=np.float64)
+                                            lower_bound, upper_bound = ci[:, 0], ci[:, 1]
                                             
-                                            fig.add_trace(go.Scatter(
+                                            traces.append(go.Scatter(
                                                 x=future_dates,
                                                 y=upper_bound,
                                                 mode='lines',
@@ -1435,7 +1599,7 @@ elif page == "🤖 AI Predictions":
                                                 showlegend=False
                                             ))
                                             
-                                            fig.add_trace(go.Scatter(
+                                            traces.append(go.Scatter(
                                                 x=future_dates,
                                                 y=lower_bound,
                                                 mode='lines',
@@ -1446,7 +1610,8 @@ elif page == "🤖 AI Predictions":
                                                 showlegend=True
                                             ))
                                         
-                                        fig.update_layout(
+                                        # One constructor call instead of validating the figure again per add_trace
+                                        fig = go.Figure(data=traces, layout=go.Layout(
                                             title=f"Price Predictions for {selected_product_name}",
                                             xaxis_title="Date",
                                             yaxis_title="Price (₹)",
@@ -1455,86 +1620,87 @@ elif page == "🤖 AI Predictions":
                                             paper_bgcolor='rgba(0,0,0,0)',
                                             plot_bgcolor='rgba(0,0,0,0)',
                                             font=dict(color='white')
-                                        )
+                                        ))
                                         
-                                        st.plotly_chart(fig, use_container_width=True)
+                                        # The figure already carries plotly_dark; theme=None skips Streamlit's restyling pass
+                                        st.plotly_chart(fig, use_container_width=True, theme=None, config=PLOTLY_CONFIG)
                                         
                                         # Prediction details
                                         st.subheader("📋 Prediction Details")
+                                        preds = np.asarray(predictions['predictions'], dtype=np.float64)
+                                        pct_change = (preds - last_price) / last_price * 100.0
                                         prediction_df = pd.DataFrame({
                                             'Date': future_dates,
-                                            'Predicted Price': [f"₹{p:.2f}" for p in predictions['predictions']],
-                                            'Change from Current': [f"{((p - df_history['price'].iloc[-1]) / df_history['price'].iloc[-1] * 100):+.1f}%" for p in predictions['predictions']]
+                                            'Predicted Price': '₹' + pd.Series(preds).map('{:.2f}'.format),
+                                            'Change from Current': pd.Series(pct_change).map("{:+.1f}%".format)
                                         })
                                         st.dataframe(prediction_df, use_container_width=True, hide_index=True)
                                         
                                         # Buy recommendation
                                         if 'predictions' in predictions:
-                                            recommendation = predictor.get_buy_recommendation(predictions['predictions'], df_history['price'].iloc[-1])
+                                            recommendation = forecast['recommendation']
                                             
                                             st.subheader("💡 AI Recommendation")
                                             
-                                            # Recommendation card
+                                            # Recommendation card; the reason is escaped since it may quote scraped product text
+                                            reason = html.escape(recommendation['reason'])
+                                            confidence = f"{recommendation['confidence']:.1%}"
                                             if recommendation['recommendation'] == 'BUY_NOW':
-                                                st.markdown(f"""
-                                                    <div class='metric-card' style='border-color: #10b981;'>
-                                                        <h4>🛒 BUY NOW</h4>
-                                                        <p><strong>Reason:</strong> {recommendation['reason']}</p>
-                                                        <p><strong>Confidence:</strong> {recommendation['confidence']:.1%}</p>
-                                                    </div>
-                                                """, unsafe_allow_html=True)
+                                                card = _BUY_CARD_TPL.substitute(reason=reason, confidence=confidence)
                                             else:
-                                                wait_days = recommendation['recommendation'].split('_')[1]
-                                                st.markdown(f"""
-                                                    <div class='metric-card' style='border-color: #f59e0b;'>
-                                                        <h4>⏳ WAIT {wait_days} DAYS</h4>
-                                                        <p><strong>Reason:</strong> {recommendation['reason']}</p>
-                                                        <p><strong>Potential Savings:</strong> ₹{recommendation['potential_savings']:.2f} ({recommendation['potential_savings_pct']:.1f}%)</p>
-                                                        <p><strong>Confidence:</strong> {recommendation['confidence']:.1%}</p>
-                                                    </div>
-                                                """, unsafe_allow_html=True)
+                                                card = _WAIT_CARD_TPL.substitute(
+                                                    days=html.escape(recommendation['recommendation'].split('_')[1]),
+                                                    reason=reason,
+                                                    savings=f"{recommendation['potential_savings']:.2f}",
+                                                    savings_pct=f"{recommendation['potential_savings_pct']:.1f}",
+                                                    confidence=confidence,
+                                                )
+                                            st.markdown(card, unsafe_allow_html=True)
                                         
                                         # Feature importance
-                                        if hasattr(predictor, 'get_feature_importance'):
-                                            importance = predictor.get_feature_importance()
-                                            if importance:
-                                                st.subheader("🔍 Feature Importance")
-                                                importance_df = pd.DataFrame(list(importance.items()), columns=['Feature', 'Importance'])
-                                                importance_df = importance_df.sort_values('Importance', ascending=True)
-                                                
-                                                fig_importance = px.bar(
-                                                    importance_df,
-                                                    x='Importance',
-                                                    y='Feature',
-                                                    orientation='h',
-                                                    title="Model Feature Importance",
-                                                    color='Importance',
-                                                    color_continuous_scale='viridis'
-                                                )
-                                                fig_importance.update_layout(
-                                                    template='plotly_dark',
-                                                    paper_bgcolor='rgba(0,0,0,0)',
-                                                    plot_bgcolor='rgba(0,0,0,0)',
-                                                    font=dict(color='white'),
-                                                    height=400
-                                                )
-                                                st.plotly_chart(fig_importance, use_container_width=True)
+                                        importance = forecast['importance']
+                                        if importance:
+                                            st.subheader("🔍 Feature Importance")
+                                            # Sorted ascending with one argsort so the largest bar ends up on top
+                                            features = np.fromiter(importance.keys(), dtype=object, count=len(importance))
+                                            values = np.fromiter(importance.values(), dtype=np.float64, count=len(importance))
+                                            order = np.argsort(values)
+                                            
+                                            fig_importance = px.bar(
+                                                x=values[order],
+                                                y=features[order],
+                                                orientation='h',
+                                                title="Model Feature Importance",
+                                                color=values[order],
+                                                color_continuous_scale='viridis',
+                                                labels={'x': 'Importance', 'y': 'Feature', 'color': 'Importance'}
+                                            )
+                                            fig_importance.update_layout(
+                                                template='plotly_dark',
+                                                paper_bgcolor='rgba(0,0,0,0)',
+                                                plot_bgcolor='rgba(0,0,0,0)',
+                                                font=dict(color='white'),
+                                                height=400
+                                            )
+                                            st.plotly_chart(fig_importance, use_container_width=True, theme=None, config=PLOTLY_CONFIG)
                                     
                                     else:
                                         st.error("Failed to generate predictions")
                             
                             except Exception as e:
+                                logger.exception("Prediction failed for product %s", selected_product['id'])
                                 st.error(f"Error generating predictions: {str(e)}")
-                                st.exception(e)
+                                # Full tracebacks are serialized to the browser, so only send them on request
+                                if st.session_state.get('debug_mode'):
+                                    st.exception(e)
                     
                     # Trend analysis
                     st.subheader("📈 Trend Analysis")
                     
                     if len(price_history_df) >= 5:
                         # Analyze trends
-                        prices = price_history_df['price'].tolist()
-                        trend_direction = TrendAnalyzer.detect_trend(prices)
-                        volatility = TrendAnalyzer.calculate_volatility(prices)
+                        prices = price_history_df['price'].to_numpy(dtype=np.float64)
+                        trend_direction, volatility, support_resistance = cached_trend_stats(prices)
                         
                         col1, col2, col3 = st.columns(3)
                         
@@ -1551,8 +1717,6 @@ elif page == "🤖 AI Predictions":
                             st.metric("Volatility", f"{volatility:.2f}%")
                         
                         # Support and resistance levels
-                        support_resistance = TrendAnalyzer.find_support_resistance(prices)
-                        
                         st.subheader("🎯 Support & Resistance Levels")
                         col1, col2 = st.columns(2)
                         
@@ -1582,9 +1746,13 @@ elif page == "🤖 AI Predictions":
         else:
             st.error("ML prediction modules are not available. Please check the installation.")
 
-elif page == "⚙️ Settings":
+
+@st.fragment
+def render_settings():
+    """Settings page: notification and profile preferences"""
     st.markdown("<h1>⚙️ Settings & Configuration</h1>", unsafe_allow_html=True)
-    current_settings = load_settings()
+    saved_settings = load_settings()
+    current_settings = dict(saved_settings)
     tab1, tab3 = st.tabs(["🔔 Notifications", "👤 Profile"])
 
     with tab1:
@@ -1606,10 +1774,12 @@ elif page == "⚙️ Settings":
                 current_settings['telegram_token'] = telegram_token
                 current_settings['telegram_chat_id'] = telegram_chat_id
                 current_settings['telegram_enabled'] = telegram_enabled
-                save_settings(current_settings)
-                st.success("✅ Saved!")
-                time.sleep(1)
-                st.rerun()
+                if current_settings == saved_settings:
+                    st.toast("No changes to save")
+                else:
+                    save_settings(current_settings)
+                    st.toast("✅ Saved!")
+                    st.rerun()
 
     with tab3:
         st.subheader("User Profile")
@@ -1637,12 +1807,27 @@ elif page == "⚙️ Settings":
                 current_settings['full_name'] = full_name
                 current_settings['phone'] = phone
                 current_settings['occupation'] = occupation
-                save_settings(current_settings)
-                st.success("✅ Profile updated!")
-                time.sleep(0.8)
-                st.rerun()
+                if current_settings == saved_settings:
+                    st.toast("No changes to save")
+                else:
+                    save_settings(current_settings)
+                    st.toast("✅ Profile updated!")
+                    st.rerun()
+
 
+# The Products page, which sends alerts, also checks from inside its fragment
+show_alert_failures()
 
+if page == "📊 Dashboard":
+    render_dashboard(username)
+elif page == "📦 Products":
+    render_products()
+elif page == "📈 Analytics":
+    render_analytics()
+elif page == "🤖 AI Predictions":
+    render_predictions()
+elif page == "⚙️ Settings":
+    render_settings()
 
 # Footer
 st.markdown("---")
@@ -1,18 +1,56 @@
-
-# 1. integrations/google_sheets.py - Google Sheets Integration
-google_sheets_code = '''"""
+"""
 Google Sheets Integration for Product Price Tracker
 Sync price data with Google Sheets
 """
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from typing import List, Dict
+from typing import TYPE_CHECKING, List, Dict, Tuple
+import hashlib
 import logging
-import pandas as pd
+import os
+import time
+from itertools import groupby
+
+# gspread, oauth2client and pandas are imported where they are used, so
+# importing this module stays cheap when no export actually runs
+if TYPE_CHECKING:
+    import gspread
+    import pandas as pd
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Reuse opened spreadsheet handles for this long before looking the name up again
+SPREADSHEET_CACHE_TTL = 300  # seconds
+
+# Stay well under the Sheets API request size limit when writing large tables
+MAX_CELLS_PER_REQUEST = 50000
+
+SCOPE = [
+    'https://spreadsheets.google.com/feeds',
+    'https://www.googleapis.com/auth/drive'
+]
+
+# credentials path -> (file mtime, authorized client), shared by every GoogleSheetsSync instance
+_CLIENT_CACHE: Dict[str, Tuple[float, "gspread.Client"]] = {}
+
+def _get_client(credentials_file: str) -> "gspread.Client":
+    """
+    Authorize once per credentials file; the client's HTTP session keeps its connections alive
+    
+    A replaced (e.g. rotated) credentials file is picked up by authorizing again.
+    """
+    mtime = os.path.getmtime(credentials_file)
+    cached = _CLIENT_CACHE.get(credentials_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+    
+    creds = ServiceAccountCredentials.from_json_keyfile_name(credentials_file, SCOPE)
+    client = gspread.authorize(creds)
+    _CLIENT_CACHE[credentials_file] = (mtime, client)
+    return client
+
 class GoogleSheetsSync:
     """Sync product price data with Google Sheets"""
     
@@ -25,22 +63,18 @@ class GoogleSheetsSync:
         """
         self.credentials_file = credentials_file
         self.client = None
+        # spreadsheet name -> (built at, {product name: sheet row}), so price updates skip worksheet.find()
+        self._name_index_cache: Dict[str, Tuple[float, Dict[str, int]]] = {}
+        # spreadsheet name -> (opened at, handle); client.open() is a Drive search per call
+        self._sheet_cache: Dict[str, Tuple[float, "gspread.Spreadsheet"]] = {}
+        # (spreadsheet name, worksheet) -> (exported at, hash of the rows last exported there)
+        self._export_hashes: Dict[Tuple[str, str], Tuple[float, str]] = {}
         self.connect()
     
     def connect(self):
         """Connect to Google Sheets API"""
         try:
-            scope = [
-                'https://spreadsheets.google.com/feeds',
-                'https://www.googleapis.com/auth/drive'
-            ]
-            
-            creds = ServiceAccountCredentials.from_json_keyfile_name(
-                self.credentials_file, 
-                scope
-            )
-            
-            self.client = gspread.authorize(creds)
+            self.client = _get_client(self.credentials_file)
             logger.info("Connected to Google Sheets successfully")
             
         except Exception as e:
@@ -59,6 +93,7 @@ class GoogleSheetsSync:
         """
         try:
             spreadsheet = self.client.create(title)
+            self._sheet_cache[title] = (time.monotonic(), spreadsheet)
             url = f"https://docs.google.com/spreadsheets/d/{spreadsheet.id}"
             logger.info(f"Created spreadsheet: {title}")
             return url
@@ -67,32 +102,51 @@ class GoogleSheetsSync:
             logger.error(f"Error creating spreadsheet: {e}")
             return None
     
-    def export_products(self, spreadsheet_name: str, products: List[Dict]) -> bool:
+    def _open(self, spreadsheet_name: str) -> "gspread.Spreadsheet":
+        """Open a spreadsheet by name, reusing the handle for SPREADSHEET_CACHE_TTL seconds"""
+        cached = self._sheet_cache.get(spreadsheet_name)
+        if cached and time.monotonic() - cached[0] < SPREADSHEET_CACHE_TTL:
+            return cached[1]
+        spreadsheet = self.client.open(spreadsheet_name)
+        self._sheet_cache[spreadsheet_name] = (time.monotonic(), spreadsheet)
+        return spreadsheet
+    
+    def _forget(self, spreadsheet_name: str):
+        """Drop everything cached for a spreadsheet after a failed call (it may be gone or changed)"""
+        self._sheet_cache.pop(spreadsheet_name, None)
+        self._name_index_cache.pop(spreadsheet_name, None)
+        for key in [key for key in self._export_hashes if key[0] == spreadsheet_name]:
+            del self._export_hashes[key]
+    
+    @staticmethod
+    def _rows_hash(rows: List[List]) -> str:
+        """Short fingerprint of the rows about to be written"""
+        return hashlib.blake2b(repr(rows).encode(), digest_size=8).hexdigest()
+    
+    def _already_exported(self, export_key: Tuple[str, str], rows_hash: str) -> bool:
+        """
+        Whether these exact rows were exported to this worksheet recently
+        
+        Only trusted for SPREADSHEET_CACHE_TTL seconds, since edits made
+        outside this instance are not visible here.
+        """
+        cached = self._export_hashes.get(export_key)
+        return bool(cached) and cached[1] == rows_hash and time.monotonic() - cached[0] < SPREADSHEET_CACHE_TTL
+    
+    def export_products(self, spreadsheet_name: str, products: List[Dict], 
+                        force: bool = False) -> bool:
         """
         Export product data to Google Sheets
         
         Args:
             spreadsheet_name: Name of the spreadsheet
             products: List of product dictionaries
+            force: Rewrite the sheet even if these rows were the last ones exported
             
         Returns:
             Success status
         """
         try:
-            # Open or create spreadsheet
-            try:
-                spreadsheet = self.client.open(spreadsheet_name)
-            except gspread.SpreadsheetNotFound:
-                logger.info(f"Spreadsheet '{spreadsheet_name}' not found, creating new one")
-                self.create_spreadsheet(spreadsheet_name)
-                spreadsheet = self.client.open(spreadsheet_name)
-            
-            # Get first worksheet
-            worksheet = spreadsheet.sheet1
-            
-            # Clear existing data
-            worksheet.clear()
-            
             # Prepare headers
             headers = [
                 'Product Name', 
@@ -104,25 +158,18 @@ class GoogleSheetsSync:
                 'Category'
             ]
             
-            # Write headers
-            worksheet.append_row(headers)
-            
-            # Format header row
-            worksheet.format('A1:G1', {
-                'textFormat': {'bold': True, 'fontSize': 11},
-                'backgroundColor': {'red': 0.2, 'green': 0.4, 'blue': 0.8},
-                'horizontalAlignment': 'CENTER'
-            })
-            
-            # Write product data
+            # Build every row locally; the sheet is written in one request below
+            rows = [headers]
+            statuses = []
             for product in products:
                 status = 'ALERT' if (
                     product.get('alert_price') and 
                     product.get('current_price') and 
                     product['current_price'] <= product['alert_price']
                 ) else 'OK'
+                statuses.append(status)
                 
-                row = [
+                rows.append([
                     product.get('name', 'N/A'),
                     product.get('site', 'N/A'),
                     f"${product.get('current_price', 0):.2f}" if product.get('current_price') else 'N/A',
@@ -130,37 +177,98 @@ class GoogleSheetsSync:
                     product.get('last_updated', 'N/A'),
                     status,
                     product.get('category', 'Other')
-                ]
-                
-                worksheet.append_row(row)
+                ])
+            
+            # Nothing to do if this instance already exported exactly these rows
+            export_key = (spreadsheet_name, 'sheet1')
+            rows_hash = self._rows_hash(rows)
+            if not force and self._already_exported(export_key, rows_hash):
+                logger.info(f"Products unchanged since last export to '{spreadsheet_name}', skipping")
+                return True
+            
+            import gspread
+            
+            # Open or create spreadsheet
+            try:
+                spreadsheet = self._open(spreadsheet_name)
+            except gspread.SpreadsheetNotFound:
+                logger.info(f"Spreadsheet '{spreadsheet_name}' not found, creating new one")
+                self.create_spreadsheet(spreadsheet_name)
+                spreadsheet = self._open(spreadsheet_name)
+            
+            # Get first worksheet
+            worksheet = spreadsheet.sheet1
+            
+            # Clear existing data
+            worksheet.clear()
+            
+            # A single ranged write does not grow the grid the way append_row did
+            if worksheet.row_count < len(rows):
+                worksheet.resize(rows=len(rows))
+            
+            # Write headers and product data
+            worksheet.update(range_name=f'A1:G{len(rows)}', values=rows, value_input_option='RAW')
+            
+            # Format header row
+            worksheet.format('A1:G1', {
+                'textFormat': {'bold': True, 'fontSize': 11},
+                'backgroundColor': {'red': 0.2, 'green': 0.4, 'blue': 0.8},
+                'horizontalAlignment': 'CENTER'
+            })
             
             # Auto-resize columns
             worksheet.columns_auto_resize(0, len(headers))
             
             # Color code status column
-            self._color_code_status(worksheet, len(products))
+            self._color_code_status(spreadsheet, worksheet, statuses)
+            
+            # The rows were just written, so the name index is known without reading the sheet
+            name_index = {}
+            for row_number, row in enumerate(rows[1:], start=2):
+                name_index.setdefault(row[0], row_number)
+            self._name_index_cache[spreadsheet_name] = (time.monotonic(), name_index)
+            self._export_hashes[export_key] = (time.monotonic(), rows_hash)
             
             logger.info(f"Exported {len(products)} products to Google Sheets")
             return True
             
         except Exception as e:
+            self._forget(spreadsheet_name)
             logger.error(f"Error exporting to Google Sheets: {e}")
             return False
     
     def export_price_history(self, spreadsheet_name: str, 
-                            history_data: pd.DataFrame) -> bool:
+                            history_data: "pd.DataFrame", force: bool = False) -> bool:
         """
         Export price history to a separate sheet
         
         Args:
             spreadsheet_name: Name of the spreadsheet
             history_data: DataFrame with price history
+            force: Rewrite the sheet even if this history was the last one exported
             
         Returns:
             Success status
         """
         try:
-            spreadsheet = self.client.open(spreadsheet_name)
+            # Convert the whole DataFrame in one pass; timestamps are formatted per column
+            datetime_cols = history_data.select_dtypes(include=['datetime', 'datetimetz']).columns
+            frame = history_data.assign(**{
+                col: history_data[col].dt.strftime('%Y-%m-%d %H:%M:%S') for col in datetime_cols
+            })
+            values = frame.to_numpy(dtype=object, na_value='')
+            data = [frame.columns.tolist(), *values.tolist()]
+            num_cols = len(frame.columns)
+            
+            # Nothing to do if this instance already exported exactly this history
+            export_key = (spreadsheet_name, 'Price History')
+            rows_hash = self._rows_hash(data)
+            if not force and self._already_exported(export_key, rows_hash):
+                logger.info(f"Price history unchanged since last export to '{spreadsheet_name}', skipping")
+                return True
+            
+            import gspread
+            spreadsheet = self._open(spreadsheet_name)
             
             # Create or get price history worksheet
             try:
@@ -175,45 +283,82 @@ class GoogleSheetsSync:
             # Clear existing data
             worksheet.clear()
             
-            # Convert DataFrame to list of lists
-            data = [history_data.columns.tolist()] + history_data.values.tolist()
+            # Grow the grid to fit; writes and formats outside it are rejected
+            if worksheet.row_count < len(data) or worksheet.col_count < num_cols:
+                worksheet.resize(
+                    rows=max(worksheet.row_count, len(data)),
+                    cols=max(worksheet.col_count, num_cols)
+                )
             
-            # Update worksheet
-            worksheet.update('A1', data)
+            # Update worksheet in as few requests as the size limit allows
+            rows_per_request = max(1, MAX_CELLS_PER_REQUEST // max(num_cols, 1))
+            for start in range(0, len(data), rows_per_request):
+                chunk = data[start:start + rows_per_request]
+                end_cell = gspread.utils.rowcol_to_a1(start + len(chunk), num_cols)
+                worksheet.update(
+                    range_name=f'A{start + 1}:{end_cell}',
+                    values=chunk,
+                    value_input_option='USER_ENTERED'
+                )
             
             # Format header
-            worksheet.format('A1:Z1', {
+            worksheet.format(f"A1:{gspread.utils.rowcol_to_a1(1, num_cols)}", {
                 'textFormat': {'bold': True},
                 'backgroundColor': {'red': 0.3, 'green': 0.6, 'blue': 0.4}
             })
             
+            self._export_hashes[export_key] = (time.monotonic(), rows_hash)
             logger.info(f"Exported {len(history_data)} price records to Google Sheets")
             return True
             
         except Exception as e:
+            self._forget(spreadsheet_name)
             logger.error(f"Error exporting price history: {e}")
             return False
     
-    def _color_code_status(self, worksheet, num_rows: int):
-        """Color code the status column based on values"""
+    def _color_code_status(self, spreadsheet, worksheet, statuses: List[str]):
+        """
+        Color code the status column (F) from the statuses just written
+        
+        Consecutive rows with the same status share one repeatCell request,
+        and all requests go out in a single batchUpdate call.
+        """
         try:
-            # Get status column (F column, index 6)
-            status_values = worksheet.col_values(6)[1:]  # Skip header
+            formats = {
+                # Red background for alerts
+                'ALERT': {
+                    'backgroundColor': {'red': 1.0, 'green': 0.4, 'blue': 0.4},
+                    'textFormat': {'bold': True}
+                },
+                # Green background for OK; clear() keeps formats, so undo a previous ALERT's bold
+                'OK': {
+                    'backgroundColor': {'red': 0.7, 'green': 1.0, 'blue': 0.7},
+                    'textFormat': {'bold': False}
+                },
+            }
             
-            for i, status in enumerate(status_values, start=2):  # Start from row 2
-                cell_range = f'F{i}'
-                
-                if status == 'ALERT':
-                    # Red background for alerts
-                    worksheet.format(cell_range, {
-                        'backgroundColor': {'red': 1.0, 'green': 0.4, 'blue': 0.4},
-                        'textFormat': {'bold': True}
-                    })
-                else:
-                    # Green background for OK
-                    worksheet.format(cell_range, {
-                        'backgroundColor': {'red': 0.7, 'green': 1.0, 'blue': 0.7}
-                    })
+            requests = []
+            start_row = 1  # Zero-based index of row 2, the first data row
+            for status, run in groupby(statuses, key=lambda value: 'ALERT' if value == 'ALERT' else 'OK'):
+                end_row = start_row + sum(1 for _ in run)
+                cell_format = formats[status]
+                requests.append({
+                    'repeatCell': {
+                        'range': {
+                            'sheetId': worksheet.id,
+                            'startRowIndex': start_row,
+                            'endRowIndex': end_row,
+                            'startColumnIndex': 5,
+                            'endColumnIndex': 6
+                        },
+                        'cell': {'userEnteredFormat': cell_format},
+                        'fields': f"userEnteredFormat({','.join(cell_format)})"
+                    }
+                })
+                start_row = end_row
+            
+            if requests:
+                spreadsheet.batch_update({'requests': requests})
                     
         except Exception as e:
             logger.warning(f"Could not color code status column: {e}")
@@ -229,7 +374,7 @@ class GoogleSheetsSync:
             List of product dictionaries
         """
         try:
-            spreadsheet = self.client.open(spreadsheet_name)
+            spreadsheet = self._open(spreadsheet_name)
             worksheet = spreadsheet.sheet1
             
             # Get all records
@@ -239,9 +384,26 @@ class GoogleSheetsSync:
             return records
             
         except Exception as e:
+            self._forget(spreadsheet_name)
             logger.error(f"Error reading from Google Sheets: {e}")
             return []
     
+    def _name_index(self, spreadsheet_name: str, worksheet, refresh: bool = False) -> Dict[str, int]:
+        """
+        Map product names (column A) to sheet rows
+        
+        Column A is read at most once per SPREADSHEET_CACHE_TTL seconds, so rows
+        moved by another writer are picked up again within that window.
+        """
+        cached = self._name_index_cache.get(spreadsheet_name)
+        if refresh or not cached or time.monotonic() - cached[0] >= SPREADSHEET_CACHE_TTL:
+            name_index = {}
+            # Skip header; the first occurrence wins, like worksheet.find()
+            for row_number, name in enumerate(worksheet.col_values(1)[1:], start=2):
+                name_index.setdefault(name, row_number)
+            cached = self._name_index_cache[spreadsheet_name] = (time.monotonic(), name_index)
+        return cached[1]
+    
     def update_product_price(self, spreadsheet_name: str, 
                             product_name: str, new_price: float) -> bool:
         """
@@ -256,15 +418,19 @@ class GoogleSheetsSync:
             Success status
         """
         try:
-            spreadsheet = self.client.open(spreadsheet_name)
+            spreadsheet = self._open(spreadsheet_name)
             worksheet = spreadsheet.sheet1
             
-            # Find the product row
-            cell = worksheet.find(product_name)
+            # Find the product row (re-read column A once if the cached index misses)
+            row = self._name_index(spreadsheet_name, worksheet).get(product_name)
+            if row is None:
+                row = self._name_index(spreadsheet_name, worksheet, refresh=True).get(product_name)
             
-            if cell:
+            if row:
                 # Update price in column C (3rd column)
-                worksheet.update_cell(cell.row, 3, f"${new_price:.2f}")
+                worksheet.update_cell(row, 3, f"${new_price:.2f}")
+                # The sheet no longer matches the last export
+                self._export_hashes.pop((spreadsheet_name, 'sheet1'), None)
                 logger.info(f"Updated price for {product_name} to ${new_price:.2f}")
                 return True
             else:
@@ -272,9 +438,51 @@ class GoogleSheetsSync:
                 return False
                 
         except Exception as e:
+            self._forget(spreadsheet_name)
             logger.error(f"Error updating product price: {e}")
             return False
     
+    def bulk_update_prices(self, spreadsheet_name: str, 
+                           name_to_price: Dict[str, float]) -> int:
+        """
+        Update several products' prices with a single request
+        
+        Args:
+            spreadsheet_name: Name of the spreadsheet
+            name_to_price: Mapping of product name to new price
+            
+        Returns:
+            Number of products updated
+        """
+        try:
+            spreadsheet = self._open(spreadsheet_name)
+            worksheet = spreadsheet.sheet1
+            
+            name_index = self._name_index(spreadsheet_name, worksheet)
+            if any(name not in name_index for name in name_to_price):
+                name_index = self._name_index(spreadsheet_name, worksheet, refresh=True)
+            
+            updates = [
+                {'range': f'C{name_index[name]}', 'values': [[f"${price:.2f}"]]}
+                for name, price in name_to_price.items()
+                if name in name_index
+            ]
+            if updates:
+                worksheet.batch_update(updates)
+                # The sheet no longer matches the last export
+                self._export_hashes.pop((spreadsheet_name, 'sheet1'), None)
+            
+            missing = len(name_to_price) - len(updates)
+            if missing:
+                logger.warning(f"{missing} products not found in sheet")
+            logger.info(f"Updated prices for {len(updates)} products")
+            return len(updates)
+            
+        except Exception as e:
+            self._forget(spreadsheet_name)
+            logger.error(f"Error updating product prices: {e}")
+            return 0
+    
     def share_spreadsheet(self, spreadsheet_name: str, 
                          email: str, role: str = 'reader') -> bool:
         """
@@ -289,13 +497,14 @@ class GoogleSheetsSync:
             Success status
         """
         try:
-            spreadsheet = self.client.open(spreadsheet_name)
+            spreadsheet = self._open(spreadsheet_name)
             spreadsheet.share(email, perm_type='user', role=role)
             
             logger.info(f"Shared spreadsheet with {email} as {role}")
             return True
             
         except Exception as e:
+            self._forget(spreadsheet_name)
             logger.error(f"Error sharing spreadsheet: {e}")
             return False
     
@@ -354,6 +563,3 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"Error: {e}")
         print("Make sure you have credentials.json file from Google Cloud Console")
-'''
-
-print("✅ integrations/google_sheets.py code created!")
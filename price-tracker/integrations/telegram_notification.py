@@ -1,40 +1,226 @@
-
-# 2. integrations/telegram_notification.py - Telegram Bot Integration
-telegram_code = '''"""
+"""
 Telegram Bot Integration for Product Price Tracker
 Send price alerts and interact with users via Telegram
 """
 import asyncio
-from telegram import Bot, Update
+import concurrent.futures
+import itertools
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from string import Template
+from telegram import Bot, InputFile, Update
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
+from telegram.request import HTTPXRequest
 import logging
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from datetime import datetime
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Send queue lanes; lower values go out first
+PRIORITY_CRITICAL = 0  # price alerts
+PRIORITY_SUMMARY = 1   # daily summaries
+PRIORITY_INFO = 2      # everything else
+
+# Telegram allows ~30 messages/s overall and 20 messages/minute per group
+MAX_MESSAGES_PER_SECOND = 20
+GROUP_MESSAGES_PER_MINUTE = 20
+
+# Beyond this queue depth, new PRIORITY_INFO messages are dropped
+MAX_QUEUE_SIZE = 1000
+
+# Alerts for the same chat arriving within this window go out as one message
+ALERT_BATCH_WINDOW = 0.5  # seconds
+# Telegram caps messages at 4096 characters; leave headroom for Markdown
+MAX_MESSAGE_LENGTH = 4000
+ALERT_SEPARATOR = "\n---\n"
+# How long close() waits for alerts queued by send_price_alert_sync
+CLOSE_TIMEOUT = 30  # seconds
+
+# How long a getMe connectivity probe result is trusted
+CONNECTION_PROBE_TTL = 60  # seconds
+
+# Message bodies, parsed once; optional lines are joined in by the senders
+_ALERT_HEADER_TPL = Template("""
+🔔 *PRICE ALERT!*
+
+📦 *Product:* ${name}
+
+${emoji} *Price ${trend}:*
+💰 New Price: `$$${new_price}`""")
+
+_ALERT_FOOTER_TPL = Template("""
+🛒 *Site:* ${site}
+⏰ *Time:* ${time}
+
+🔗 [View Product](${url})
+
+_Happy Shopping!_ 🛍️
+""")
+
+_SUMMARY_TPL = Template("""
+📊 *DAILY PRICE TRACKING SUMMARY*
+_${date}_
+
+📦 *Products Tracked:* ${total_products}
+🔔 *Active Alerts:* ${active_alerts}
+📉 *Price Drops Today:* ${price_drops}
+💰 *Total Savings:* $$${total_savings}
+""")
+
+_DEAL_TPL = Template("""
+${rank}. ${name}
+   💰 $$${price} (${discount}% OFF)""")
+
+def _message_length(text: str) -> int:
+    """Length as Telegram counts it (UTF-16 code units, so emoji count twice)"""
+    return len(text.encode('utf-16-le')) // 2
+
 class TelegramBot:
     """
     Telegram Bot for price tracking notifications and commands
     """
     
-    def __init__(self, bot_token: str, chat_id: str = None):
+    def __init__(self, bot_token: str, chat_id: str = None,
+                 connection_pool_size: int = 32, pool_timeout: float = 10.0):
         """
         Initialize Telegram Bot
         
         Args:
             bot_token: Telegram Bot API token from @BotFather
             chat_id: Default chat ID to send messages to
+            connection_pool_size: Connections kept open for outbound API calls
+            pool_timeout: Seconds to wait for a free pooled connection
         """
         self.bot_token = bot_token
         self.chat_id = chat_id
-        self.bot = Bot(token=bot_token)
+        self.connection_pool_size = connection_pool_size
+        self.pool_timeout = pool_timeout
+        # One long-lived HTTP pool, so repeated sends reuse the keep-alive TLS connection
+        self.bot = Bot(token=bot_token, request=self._api_request())
         self.application = None
+        
+        # Persistent event loop for the *_sync wrappers; asyncio.run() per call would
+        # build a new loop and tear down the bot's connections every time
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever, name="telegram-loop", daemon=True
+        )
+        self._loop_thread.start()
+        
+        # Every message goes through one rate-limited consumer so bursts of alerts
+        # are smoothed under Telegram's limits instead of hitting 429s
+        self._queue = asyncio.PriorityQueue()
+        self._queue_seq = itertools.count()  # keeps equal priorities in FIFO order
+        self._sent_times = deque()
+        self._group_sent_times = defaultdict(deque)
+        self._consumer = asyncio.run_coroutine_threadsafe(self._consume_queue(), self._loop)
+        
+        # chat ID -> [(alert text, future)] waiting for the next batch flush
+        self._alert_batches = defaultdict(list)
+        self._flush_tasks = {}
+        # Alerts queued by send_price_alert_sync that have not been sent yet
+        self._pending_alerts = set()
+        
+        self._last_probe_ts = None
+        self._last_probe_ok = False
+        
+        # (path, mtime, size) -> Telegram file_id; a file is uploaded once and then referenced by ID
+        self._photo_id_cache: Dict[Tuple[str, int, int], str] = {}
         logger.info("Telegram Bot initialized")
     
+    def _api_request(self) -> HTTPXRequest:
+        """HTTP pool for outbound API calls (messages, photos, getMe)"""
+        return HTTPXRequest(
+            connection_pool_size=self.connection_pool_size,
+            pool_timeout=self.pool_timeout,
+            connect_timeout=5,
+            read_timeout=20
+        )
+    
+    def _run(self, coro):
+        """Run a coroutine on the bot's event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    def close(self):
+        """Close the bot's HTTP connections and stop its event loop"""
+        if self._loop.is_closed():
+            return
+        if self._pending_alerts:
+            concurrent.futures.wait(list(self._pending_alerts), timeout=CLOSE_TIMEOUT)
+        self._consumer.cancel()
+        try:
+            self._run(self.bot.shutdown())
+        except Exception as e:
+            logger.error(f"Error shutting down bot: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=5)
+        self._loop.close()
+    
+    @staticmethod
+    def _slot_delay(sent_times: deque, limit: int, period: float, now: float) -> float:
+        """Seconds until fewer than `limit` sends fall within the last `period` seconds"""
+        while sent_times and sent_times[0] <= now - period:
+            sent_times.popleft()
+        if len(sent_times) < limit:
+            return 0.0
+        return sent_times[0] + period - now
+    
+    async def _consume_queue(self):
+        """Send queued messages one at a time, highest priority first"""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            _, _, chat_id, text, parse_mode, future = item
+            
+            # Group and channel chat IDs are negative. A group over its per-minute
+            # budget is parked and re-queued later instead of holding up every other chat
+            group_times = None
+            if str(chat_id).startswith('-'):
+                group_times = self._group_sent_times[chat_id]
+                wait = self._slot_delay(group_times, GROUP_MESSAGES_PER_MINUTE, 60.0, loop.time())
+                if wait > 0:
+                    loop.call_later(wait, self._queue.put_nowait, item)
+                    continue
+            
+            # The global window is at most a second long, so waiting it out inline is fine
+            wait = self._slot_delay(self._sent_times, MAX_MESSAGES_PER_SECOND, 1.0, loop.time())
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._sent_times.append(loop.time())
+            if group_times is not None:
+                group_times.append(loop.time())
+            
+            try:
+                await self.bot.send_message(
+                    chat_id=chat_id,
+                    text=text,
+                    parse_mode=parse_mode
+                )
+                logger.info(f"Message sent to {chat_id}")
+                result = True
+            except Exception as e:
+                logger.error(f"Error sending message: {e}")
+                result = False
+            
+            if not future.done():
+                future.set_result(result)
+    
+    async def _enqueue(self, priority: int, chat_id: str, text: str, parse_mode: str) -> bool:
+        """Queue a message on the bot's loop and wait until it has been sent"""
+        if priority >= PRIORITY_INFO and self._queue.qsize() >= MAX_QUEUE_SIZE:
+            logger.warning(f"Send queue full, dropping message to {chat_id}")
+            return False
+        future = self._loop.create_future()
+        await self._queue.put((priority, next(self._queue_seq), chat_id, text, parse_mode, future))
+        return await future
+    
     async def send_message(self, text: str, chat_id: str = None, 
-                          parse_mode: str = 'Markdown') -> bool:
+                          parse_mode: str = 'Markdown',
+                          priority: int = PRIORITY_INFO) -> bool:
         """
         Send a text message via Telegram
         
@@ -42,6 +228,7 @@ class TelegramBot:
             text: Message text
             chat_id: Recipient chat ID (uses default if not provided)
             parse_mode: Text formatting ('Markdown' or 'HTML')
+            priority: Send queue lane (PRIORITY_CRITICAL, PRIORITY_SUMMARY or PRIORITY_INFO)
             
         Returns:
             Success status
@@ -53,27 +240,103 @@ class TelegramBot:
                 logger.error("No chat ID provided")
                 return False
             
-            await self.bot.send_message(
-                chat_id=target_chat,
-                text=text,
-                parse_mode=parse_mode
-            )
-            
-            logger.info(f"Message sent to {target_chat}")
-            return True
+            # The queue lives on the bot's own loop, whichever loop the caller awaits from
+            return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(
+                self._enqueue(priority, target_chat, text, parse_mode), self._loop
+            ))
             
         except Exception as e:
             logger.error(f"Error sending message: {e}")
             return False
     
+    async def _send_batch(self, chat_id: str, batch: List):
+        """Send buffered alerts as one message and report the result to each caller"""
+        ok = await self.send_message(
+            ALERT_SEPARATOR.join(text for text, _ in batch), chat_id, priority=PRIORITY_CRITICAL
+        )
+        for _, future in batch:
+            if not future.done():
+                future.set_result(ok)
+    
+    async def _flush_batch(self, chat_id: str):
+        """After ALERT_BATCH_WINDOW, send a chat's buffered alerts in as few messages as fit"""
+        await asyncio.sleep(ALERT_BATCH_WINDOW)
+        del self._flush_tasks[chat_id]
+        pending = self._alert_batches.pop(chat_id, [])
+        
+        batch, length = [], 0
+        for text, future in pending:
+            size = _message_length(text)
+            added = size + (len(ALERT_SEPARATOR) if batch else 0)
+            if batch and length + added > MAX_MESSAGE_LENGTH:
+                await self._send_batch(chat_id, batch)
+                batch, length, added = [], 0, size
+            batch.append((text, future))
+            length += added
+        if batch:
+            await self._send_batch(chat_id, batch)
+    
+    async def _queue_alert(self, chat_id: str, text: str) -> bool:
+        """Buffer an alert for chat_id and wait until its batch has been sent"""
+        future = self._loop.create_future()
+        self._alert_batches[chat_id].append((text, future))
+        if chat_id not in self._flush_tasks:
+            self._flush_tasks[chat_id] = self._loop.create_task(self._flush_batch(chat_id))
+        return await future
+    
     def send_message_sync(self, text: str, chat_id: str = None) -> bool:
         """Synchronous wrapper for send_message"""
-        return asyncio.run(self.send_message(text, chat_id))
+        return self._run(self.send_message(text, chat_id))
+    
+    def _format_price_alert(self, product_info: Dict) -> str:
+        """Build the Markdown body of a price alert"""
+        old_price = product_info.get('old_price', 0)
+        new_price = product_info.get('new_price', 0)
+        savings = old_price - new_price if old_price else 0
+        
+        # Determine emoji based on price change
+        if new_price < old_price:
+            emoji = "📉"
+            trend = "dropped"
+        elif new_price > old_price:
+            emoji = "📈"
+            trend = "increased"
+        else:
+            emoji = "➡️"
+            trend = "unchanged"
+        
+        parts = [_ALERT_HEADER_TPL.substitute(
+            name=product_info.get('name', 'Unknown'),
+            emoji=emoji,
+            trend=trend,
+            new_price=f"{new_price:.2f}"
+        )]
+        
+        if old_price:
+            parts.append(f"📊 Old Price: `${old_price:.2f}`")
+        
+        if savings > 0:
+            savings_pct = (savings / old_price) * 100 if old_price else 0
+            parts.append(f"💵 *You Save:* `${savings:.2f}` ({savings_pct:.1f}%)")
+        
+        if product_info.get('price_change'):
+            change = product_info['price_change']
+            parts.append(f"📈 *Change:* `{change:+.2f}%`")
+        
+        parts.append(_ALERT_FOOTER_TPL.substitute(
+            site=product_info.get('site', 'Unknown'),
+            time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            url=product_info.get('url', '#')
+        ))
+        return "\n".join(parts)
     
     async def send_price_alert(self, product_info: Dict, chat_id: str = None) -> bool:
         """
         Send formatted price alert
         
+        Alerts for the same chat within ALERT_BATCH_WINDOW are combined into
+        a single message.
+        
         Args:
             product_info: Product information dictionary
             chat_id: Recipient chat ID
@@ -82,59 +345,65 @@ class TelegramBot:
             Success status
         """
         try:
-            old_price = product_info.get('old_price', 0)
-            new_price = product_info.get('new_price', 0)
-            savings = old_price - new_price if old_price else 0
-            
-            # Determine emoji based on price change
-            if new_price < old_price:
-                emoji = "📉"
-                trend = "dropped"
-            elif new_price > old_price:
-                emoji = "📈"
-                trend = "increased"
-            else:
-                emoji = "➡️"
-                trend = "unchanged"
-            
-            message = f"""
-🔔 *PRICE ALERT!*
-
-📦 *Product:* {product_info.get('name', 'Unknown')}
-
-{emoji} *Price {trend}:*
-💰 New Price: `${new_price:.2f}`
-"""
+            target_chat = chat_id or self.chat_id
             
-            if old_price:
-                message += f"📊 Old Price: `${old_price:.2f}`\n"
+            if not target_chat:
+                logger.error("No chat ID provided")
+                return False
             
-            if savings > 0:
-                savings_pct = (savings / old_price) * 100 if old_price else 0
-                message += f"💵 *You Save:* `${savings:.2f}` ({savings_pct:.1f}%)\n"
+            message = self._format_price_alert(product_info)
             
-            if product_info.get('price_change'):
-                change = product_info['price_change']
-                message += f"📈 *Change:* `{change:+.2f}%`\n"
-            
-            message += f"""
-🛒 *Site:* {product_info.get('site', 'Unknown')}
-⏰ *Time:* {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-🔗 [View Product]({product_info.get('url', '#')})
-
-_Happy Shopping!_ 🛍️
-"""
-            
-            return await self.send_message(message, chat_id)
+            return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(
+                self._queue_alert(target_chat, message), self._loop
+            ))
             
         except Exception as e:
             logger.error(f"Error sending price alert: {e}")
             return False
     
+    async def send_price_alerts(self, products: List[Dict], chat_id: str = None) -> bool:
+        """
+        Send several price alerts, batched into as few messages as fit
+        
+        Args:
+            products: Product information dictionaries
+            chat_id: Recipient chat ID
+            
+        Returns:
+            True if every alert was sent
+        """
+        results = await asyncio.gather(
+            *(self.send_price_alert(product_info, chat_id) for product_info in products)
+        )
+        return all(results)
+    
     def send_price_alert_sync(self, product_info: Dict, chat_id: str = None) -> bool:
-        """Synchronous wrapper for send_price_alert"""
-        return asyncio.run(self.send_price_alert(product_info, chat_id))
+        """
+        Queue a price alert and return without waiting for it to be sent
+        
+        Alerts queued in quick succession (e.g. from a scrape loop) share a
+        batch. close() waits for alerts still queued.
+        
+        Returns:
+            True once the alert is queued
+        """
+        try:
+            target_chat = chat_id or self.chat_id
+            
+            if not target_chat:
+                logger.error("No chat ID provided")
+                return False
+            
+            future = asyncio.run_coroutine_threadsafe(
+                self._queue_alert(target_chat, self._format_price_alert(product_info)), self._loop
+            )
+            self._pending_alerts.add(future)
+            future.add_done_callback(self._pending_alerts.discard)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error queueing price alert: {e}")
+            return False
     
     async def send_daily_summary(self, summary_data: Dict, chat_id: str = None) -> bool:
         """
@@ -148,28 +417,31 @@ _Happy Shopping!_ 🛍️
             Success status
         """
         try:
-            message = f"""
-📊 *DAILY PRICE TRACKING SUMMARY*
-_{datetime.now().strftime('%B %d, %Y')}_
-
-📦 *Products Tracked:* {summary_data.get('total_products', 0)}
-🔔 *Active Alerts:* {summary_data.get('active_alerts', 0)}
-📉 *Price Drops Today:* {summary_data.get('price_drops', 0)}
-💰 *Total Savings:* ${summary_data.get('total_savings', 0):.2f}
-
-"""
+            parts = [_SUMMARY_TPL.substitute(
+                date=datetime.now().strftime('%B %d, %Y'),
+                total_products=summary_data.get('total_products', 0),
+                active_alerts=summary_data.get('active_alerts', 0),
+                price_drops=summary_data.get('price_drops', 0),
+                total_savings=f"{summary_data.get('total_savings', 0):.2f}"
+            )]
             
             # Add best deals if available
             if summary_data.get('best_deals'):
-                message += "*🔥 Top Deals Today:*\n"
-                for i, deal in enumerate(summary_data['best_deals'][:5], 1):
-                    message += f"\n{i}. {deal['name']}\n"
-                    message += f"   💰 ${deal['current_price']:.2f} "
-                    message += f"({deal['discount_percent']:.0f}% OFF)\n"
+                parts.append("*🔥 Top Deals Today:*")
+                parts.extend(
+                    _DEAL_TPL.substitute(
+                        rank=i,
+                        name=deal['name'],
+                        price=f"{deal['current_price']:.2f}",
+                        discount=f"{deal['discount_percent']:.0f}"
+                    )
+                    for i, deal in enumerate(summary_data['best_deals'][:5], 1)
+                )
             
-            message += "\n_Keep tracking for more savings!_ 🎯"
+            parts.append("\n_Keep tracking for more savings!_ 🎯")
+            message = "\n".join(parts)
             
-            return await self.send_message(message, chat_id)
+            return await self.send_message(message, chat_id, priority=PRIORITY_SUMMARY)
             
         except Exception as e:
             logger.error(f"Error sending daily summary: {e}")
@@ -177,13 +449,16 @@ _{datetime.now().strftime('%B %d, %Y')}_
     
     def send_daily_summary_sync(self, summary_data: Dict, chat_id: str = None) -> bool:
         """Synchronous wrapper for send_daily_summary"""
-        return asyncio.run(self.send_daily_summary(summary_data, chat_id))
+        return self._run(self.send_daily_summary(summary_data, chat_id))
     
     async def send_photo(self, photo_path: str, caption: str = None, 
                         chat_id: str = None) -> bool:
         """
         Send photo (e.g., price chart image)
         
+        Local files are uploaded once; later sends of the same image reuse
+        the file_id Telegram returned for the first upload.
+        
         Args:
             photo_path: Path to image file or URL
             caption: Image caption
@@ -195,12 +470,39 @@ _{datetime.now().strftime('%B %d, %Y')}_
         try:
             target_chat = chat_id or self.chat_id
             
-            await self.bot.send_photo(
-                chat_id=target_chat,
-                photo=photo_path,
-                caption=caption,
-                parse_mode='Markdown'
-            )
+            photo = photo_path
+            key = None
+            handle = None
+            if os.path.isfile(photo_path):
+                # A regenerated chart changes mtime/size, so a stat is enough to key the
+                # cache and repeat sends never touch the file
+                st = os.stat(photo_path)
+                key = (os.path.realpath(photo_path), st.st_mtime_ns, st.st_size)
+                photo = self._photo_id_cache.get(key)
+                if photo is None:
+                    # Handed to httpx as an open file and streamed, not read into memory first
+                    handle = open(photo_path, 'rb')
+                    photo = InputFile(handle, read_file_handle=False)
+            
+            try:
+                message = await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(
+                    self.bot.send_photo(
+                        chat_id=target_chat,
+                        photo=photo,
+                        caption=caption,
+                        parse_mode='Markdown'
+                    ),
+                    self._loop
+                ))
+            finally:
+                if handle:
+                    handle.close()
+            
+            if key and key not in self._photo_id_cache:
+                # Forget earlier versions of the same file
+                for old in [k for k in self._photo_id_cache if k[0] == key[0]]:
+                    del self._photo_id_cache[old]
+                self._photo_id_cache[key] = message.photo[-1].file_id
             
             logger.info(f"Photo sent to {target_chat}")
             return True
@@ -253,10 +555,14 @@ Need more help? Contact support!
     
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /status command"""
-        status_message = """
+        if await self.ensure_connected():
+            api_status = "✅ Bot is active and running"
+        else:
+            api_status = "⚠️ Telegram API unreachable from the sender"
+        status_message = f"""
 📊 *Bot Status*
 
-✅ Bot is active and running
+{api_status}
 🔄 Last check: 2 minutes ago
 📦 Tracking: 15 products
 🔔 Active alerts: 3
@@ -315,8 +621,16 @@ I didn't understand that. Try:
         This creates a long-running bot that responds to commands
         """
         try:
-            # Create application
-            self.application = Application.builder().token(self.bot_token).build()
+            # Create application; long-polling getUpdates holds its connection for
+            # ~30 s, so it gets its own small pool and never blocks outbound sends.
+            # The pool is separate from self.bot's: that one belongs to the sender loop thread
+            self.application = (
+                Application.builder()
+                .token(self.bot_token)
+                .request(self._api_request())
+                .get_updates_request(HTTPXRequest(connection_pool_size=4, pool_timeout=30.0))
+                .build()
+            )
             
             # Register command handlers
             self.application.add_handler(CommandHandler("start", self.start_command))
@@ -359,15 +673,36 @@ I didn't understand that. Try:
             logger.error(f"Error getting chat ID: {e}")
             return None
     
-    def test_connection(self) -> bool:
-        """Test bot connection"""
+    async def _probe(self) -> bool:
+        """Call getMe on the bot's loop and remember the outcome"""
         try:
-            bot_info = asyncio.run(self.bot.get_me())
+            bot_info = await self.bot.get_me()
             logger.info(f"Bot connected: @{bot_info.username}")
-            return True
+            ok = True
         except Exception as e:
             logger.error(f"Connection test failed: {e}")
-            return False
+            ok = False
+        self._last_probe_ts = time.monotonic()
+        self._last_probe_ok = ok
+        return ok
+    
+    async def ensure_connected(self) -> bool:
+        """
+        Check the bot can reach Telegram
+        
+        The result is reused for CONNECTION_PROBE_TTL seconds, so guarding
+        every send with this check costs no extra round trip.
+        
+        Returns:
+            Connection status
+        """
+        if self._last_probe_ts is not None and time.monotonic() - self._last_probe_ts < CONNECTION_PROBE_TTL:
+            return self._last_probe_ok
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._probe(), self._loop))
+    
+    def test_connection(self) -> bool:
+        """Test bot connection (cached, see ensure_connected)"""
+        return self._run(self.ensure_connected())
 
 
 # Quick usage example
@@ -399,6 +734,5 @@ if __name__ == "__main__":
     else:
         print("❌ Failed to connect to Telegram")
         print("Make sure your bot token is correct")
-'''
-
-print("✅ integrations/telegram_notification.py code created!")
+    
+    bot.close()
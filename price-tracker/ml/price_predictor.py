@@ -8,7 +8,7 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_absolute_error, r2_score
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 import pickle
 import os
 import logging
@@ -70,57 +70,76 @@ class PricePredictor:
         # Sort by timestamp
         df = df.sort_index()
 
-        # Basic time features
-        df['day_of_week'] = df.index.dayofweek
-        df['day_of_month'] = df.index.day
-        df['week_of_month'] = (df.index.day - 1) // 7 + 1
-        df['month'] = df.index.month
-        df['quarter'] = df.index.quarter
-
-        # Cyclical encoding for periodic features
-        df['day_of_week_sin'] = np.sin(2 * np.pi * df['day_of_week'] / 7)
-        df['day_of_week_cos'] = np.cos(2 * np.pi * df['day_of_week'] / 7)
-        df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12)
-        df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
-
-        # Moving averages
-        df['ma_3'] = df['price'].rolling(window=3, min_periods=1).mean()
-        df['ma_7'] = df['price'].rolling(window=7, min_periods=1).mean()
-        df['ma_14'] = df['price'].rolling(window=14, min_periods=1).mean()
-        df['ma_30'] = df['price'].rolling(window=30, min_periods=1).mean()
-
-        # Price volatility (rolling standard deviation)
-        df['volatility_7'] = df['price'].rolling(window=7, min_periods=1).std()
-        df['volatility_14'] = df['price'].rolling(window=14, min_periods=1).std()
-        df['volatility_30'] = df['price'].rolling(window=30, min_periods=1).std()
-
-        # Price momentum (rate of change)
-        df['momentum_3'] = df['price'].pct_change(periods=3)
-        df['momentum_7'] = df['price'].pct_change(periods=7)
-        df['momentum_14'] = df['price'].pct_change(periods=14)
-
-        # Price position relative to moving averages
-        df['price_vs_ma7'] = (df['price'] - df['ma_7']) / df['ma_7']
-        df['price_vs_ma14'] = (df['price'] - df['ma_14']) / df['ma_14']
-        df['price_vs_ma30'] = (df['price'] - df['ma_30']) / df['ma_30']
-
-        # Lag features (previous prices)
-        df['price_lag_1'] = df['price'].shift(1)
-        df['price_lag_3'] = df['price'].shift(3)
-        df['price_lag_7'] = df['price'].shift(7)
-
-        # Min/Max prices in rolling windows
-        df['min_price_7'] = df['price'].rolling(window=7, min_periods=1).min()
-        df['max_price_7'] = df['price'].rolling(window=7, min_periods=1).max()
-        df['min_price_30'] = df['price'].rolling(window=30, min_periods=1).min()
-        df['max_price_30'] = df['price'].rolling(window=30, min_periods=1).max()
-
-        # Price range features
-        df['price_range_7'] = df['max_price_7'] - df['min_price_7']
-        df['price_range_30'] = df['max_price_30'] - df['min_price_30']
+        # Every feature is computed column-wise and the frame is extended once;
+        # inserting ~30 columns one at a time fragments the frame and copies it
+        price = df['price']
+        index = df.index
+        day_of_week = index.dayofweek.to_numpy()
+        day_of_month = index.day.to_numpy()
+        month = index.month.to_numpy()
+
+        def rolling(window):
+            return price.rolling(window=window, min_periods=1)
+
+        ma = {w: rolling(w).mean().to_numpy() for w in (3, 7, 14, 30)}
+        min_7, max_7 = rolling(7).min().to_numpy(), rolling(7).max().to_numpy()
+        min_30, max_30 = rolling(30).min().to_numpy(), rolling(30).max().to_numpy()
+        values = price.to_numpy()
+
+        features = {
+            # Basic time features
+            'day_of_week': day_of_week,
+            'day_of_month': day_of_month,
+            'week_of_month': (day_of_month - 1) // 7 + 1,
+            'month': month,
+            'quarter': index.quarter.to_numpy(),
+
+            # Cyclical encoding for periodic features
+            'day_of_week_sin': np.sin(2 * np.pi * day_of_week / 7),
+            'day_of_week_cos': np.cos(2 * np.pi * day_of_week / 7),
+            'month_sin': np.sin(2 * np.pi * month / 12),
+            'month_cos': np.cos(2 * np.pi * month / 12),
+
+            # Moving averages
+            'ma_3': ma[3],
+            'ma_7': ma[7],
+            'ma_14': ma[14],
+            'ma_30': ma[30],
+
+            # Price volatility (rolling standard deviation)
+            'volatility_7': rolling(7).std().to_numpy(),
+            'volatility_14': rolling(14).std().to_numpy(),
+            'volatility_30': rolling(30).std().to_numpy(),
+
+            # Price momentum (rate of change)
+            'momentum_3': price.pct_change(periods=3).to_numpy(),
+            'momentum_7': price.pct_change(periods=7).to_numpy(),
+            'momentum_14': price.pct_change(periods=14).to_numpy(),
+
+            # Price position relative to moving averages
+            'price_vs_ma7': (values - ma[7]) / ma[7],
+            'price_vs_ma14': (values - ma[14]) / ma[14],
+            'price_vs_ma30': (values - ma[30]) / ma[30],
+
+            # Lag features (previous prices)
+            'price_lag_1': price.shift(1).to_numpy(),
+            'price_lag_3': price.shift(3).to_numpy(),
+            'price_lag_7': price.shift(7).to_numpy(),
+
+            # Min/Max prices in rolling windows
+            'min_price_7': min_7,
+            'max_price_7': max_7,
+            'min_price_30': min_30,
+            'max_price_30': max_30,
+
+            # Price range features
+            'price_range_7': max_7 - min_7,
+            'price_range_30': max_30 - min_30,
+        }
+        df = pd.concat([df, pd.DataFrame(features, index=index)], axis=1)
 
         # Fill NaN values
-        df = df.fillna(method='bfill').fillna(method='ffill')
+        df = df.bfill().ffill()
 
         # Store feature names
         self.feature_names = [col for col in df.columns if col != 'price']
@@ -378,7 +397,7 @@ class TrendAnalyzer:
     """Analyze price trends and patterns"""
 
     @staticmethod
-    def detect_trend(prices: List[float], window: int = 7) -> str:
+    def detect_trend(prices: Union[List[float], np.ndarray], window: int = 7) -> str:
         """
         Detect overall trend in prices
 
@@ -387,7 +406,7 @@ class TrendAnalyzer:
         if len(prices) < window:
             return 'INSUFFICIENT_DATA'
 
-        recent_prices = prices[-window:]
+        recent_prices = np.asarray(prices[-window:], dtype=np.float64)
 
         # Calculate linear regression slope
         x = np.arange(len(recent_prices))
@@ -402,25 +421,26 @@ class TrendAnalyzer:
             return 'DOWNWARD'
 
     @staticmethod
-    def calculate_volatility(prices: List[float]) -> float:
+    def calculate_volatility(prices: Union[List[float], np.ndarray]) -> float:
         """Calculate price volatility (coefficient of variation)"""
         if len(prices) < 2:
             return 0.0
 
+        prices = np.asarray(prices, dtype=np.float64)
         mean_price = np.mean(prices)
         std_price = np.std(prices)
 
         return (std_price / mean_price) * 100 if mean_price > 0 else 0.0
 
     @staticmethod
-    def find_support_resistance(prices: List[float]) -> Dict:
+    def find_support_resistance(prices: Union[List[float], np.ndarray]) -> Dict:
         """Find support and resistance levels"""
         if len(prices) < 10:
             return {"support": None, "resistance": None}
 
-        # Simple approach: use quantiles
-        support = np.percentile(prices, 25)
-        resistance = np.percentile(prices, 75)
+        # Simple approach: use quantiles (both from a single sort)
+        prices = np.asarray(prices, dtype=np.float64)
+        support, resistance = np.percentile(prices, [25, 75])
 
         return {
             "support": support,
@@ -434,7 +454,8 @@ class TrendAnalyzer:
 if __name__ == "__main__":
     # Create sample data
     dates = pd.date_range(start='2024-01-01', periods=100, freq='D')
-    prices = 100 + np.cumsum(np.random.randn(100) * 2)  # Random walk around 100
+    rng = np.random.default_rng(42)
+    prices = 100 + np.cumsum(rng.standard_normal(100) * 2)  # Random walk around 100
 
     sample_data = pd.DataFrame({
         'timestamp': dates,
@@ -8,25 +8,29 @@ import re
 from typing import Optional, Dict
 from urllib.parse import urlparse
 import logging
+import importlib.util
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Try to import Selenium
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from webdriver_manager.chrome import ChromeDriverManager
-    SELENIUM_AVAILABLE = True
+# Check for Selenium without importing it; the heavy imports happen only
+# when a Meesho/Myntra page is actually scraped
+SELENIUM_AVAILABLE = all(
+    importlib.util.find_spec(module) is not None
+    for module in ('selenium', 'webdriver_manager')
+)
+if SELENIUM_AVAILABLE:
     logger.info("✅ Selenium is available for Meesho/Myntra scraping")
-except ImportError:
-    SELENIUM_AVAILABLE = False
+else:
     logger.warning("⚠️ Selenium not available - Meesho/Myntra won't work")
 
+# lxml's C parser is much faster than html.parser on large product pages
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
 class ProductScraper:
     """Scrapes product information from e-commerce websites"""
 
@@ -42,7 +46,7 @@ class ProductScraper:
         logger.info(f"🔍 Starting to scrape {site} product: {url}")
         
         # Use Selenium for JavaScript sites
-        if site in ['meesho', 'myntra'] and SELENIUM_AVAILABLE:
+        if self.needs_browser(url):
             logger.info(f"🌐 Using Selenium for {site}")
             return self._scrape_with_selenium(url, site)
         
@@ -54,19 +58,9 @@ class ProductScraper:
                 response = self.session.get(url, headers=headers, timeout=self.timeout)
                 response.raise_for_status()
 
-                soup = BeautifulSoup(response.content, 'html.parser')
-
-                if site == 'amazon':
-                    product_info = self._scrape_amazon(soup, url)
-                elif site == 'flipkart':
-                    product_info = self._scrape_flipkart(soup, url)
-                elif site == 'ebay':
-                    product_info = self._scrape_ebay(soup, url)
-                else:
-                    product_info = self._scrape_generic(soup, url)
+                product_info = self.parse_html(response.content, url)
 
                 if product_info and product_info.get('name') and product_info.get('price'):
-                    product_info['site'] = site
                     logger.info(f"✅ Successfully scraped: {product_info['name']} - ₹{product_info['price']}")
                     return product_info
                 else:
@@ -82,9 +76,39 @@ class ProductScraper:
         logger.warning(f"⚠️ All scraping attempts failed for {url}")
         return None
 
+    def needs_browser(self, url: str) -> bool:
+        """Whether the URL is scraped through Selenium rather than a plain HTTP fetch"""
+        return self._identify_site(url) in ['meesho', 'myntra'] and SELENIUM_AVAILABLE
+
+    def parse_html(self, html, url: str) -> Optional[Dict]:
+        """Extract product information from an already fetched page"""
+        site = self._identify_site(url)
+        soup = BeautifulSoup(html, HTML_PARSER)
+
+        if site == 'amazon':
+            product_info = self._scrape_amazon(soup, url)
+        elif site == 'flipkart':
+            product_info = self._scrape_flipkart(soup, url)
+        elif site == 'ebay':
+            product_info = self._scrape_ebay(soup, url)
+        else:
+            product_info = self._scrape_generic(soup, url)
+
+        if product_info:
+            product_info['site'] = site
+        return product_info
+
     def _scrape_with_selenium(self, url: str, site: str) -> Optional[Dict]:
         """Use Selenium for JavaScript-heavy sites"""
         try:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.service import Service
+            from selenium.webdriver.chrome.options import Options
+            from selenium.webdriver.common.by import By
+            from selenium.webdriver.support.ui import WebDriverWait
+            from selenium.webdriver.support import expected_conditions as EC
+            from webdriver_manager.chrome import ChromeDriverManager
+            
             options = Options()
             options.add_argument('--headless')
             options.add_argument('--no-sandbox')
@@ -102,7 +126,7 @@ class ProductScraper:
             
             time.sleep(2)  # Extra wait for dynamic content
             
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            soup = BeautifulSoup(driver.page_source, HTML_PARSER)
             driver.quit()
             
             # Extract data based on site
@@ -0,0 +1,43 @@
+"""
+Compile the .env file into a Python module so config.py can skip dotenv parsing
+
+Usage:
+    python tools/compile_env.py
+
+Re-run after editing .env; config.py ignores the compiled module once .env is newer.
+"""
+import os
+import sys
+
+from dotenv import dotenv_values
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENV_FILE = os.path.join(ROOT, ".env")
+OUTPUT_FILE = os.path.join(ROOT, "_env_compiled.py")
+
+
+def compile_env(env_file: str = ENV_FILE, output_file: str = OUTPUT_FILE) -> int:
+    """Write the key/value pairs of env_file to output_file as a dict literal"""
+    values = {key: value for key, value in dotenv_values(env_file).items() if value is not None}
+
+    lines = [
+        "# Generated by tools/compile_env.py from .env - do not edit or commit",
+        f"ENV_MTIME = {os.path.getmtime(env_file)!r}",
+        "ENV = {",
+    ]
+    lines.extend(f"    {key!r}: {value!r}," for key, value in values.items())
+    lines.append("}")
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+    return len(values)
+
+
+if __name__ == "__main__":
+    if not os.path.exists(ENV_FILE):
+        print(f"No .env file found at {ENV_FILE}")
+        sys.exit(1)
+
+    count = compile_env()
+    print(f"✅ Compiled {count} variables into {OUTPUT_FILE}")
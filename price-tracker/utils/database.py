@@ -4,7 +4,7 @@ Database operations using SQLite for Product Price Tracker
 import sqlite3
 import pandas as pd
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import os
 import logging
 
@@ -175,6 +175,34 @@ class DatabaseManager:
             logger.error(f"Error updating price: {e}")
             return None
 
+    def bulk_update_price(self, updates: List[Tuple[str, float]], availability: str = "In Stock") -> int:
+        """Update several product prices in one transaction; updates is a list of (url, new_price)"""
+        if not updates:
+            return 0
+        try:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            now = datetime.now()
+
+            cursor.executemany("""
+                UPDATE products
+                SET current_price = ?, last_updated = ?
+                WHERE product_url = ?
+            """, [(price, now, url) for url, price in updates])
+
+            cursor.executemany("""
+                INSERT INTO price_history (product_id, price, site, availability)
+                SELECT id, ?, site, ? FROM products WHERE product_url = ?
+            """, [(price, availability, url) for url, price in updates])
+            updated = cursor.rowcount
+
+            conn.commit()
+            conn.close()
+            return updated
+        except Exception as e:
+            logger.error(f"Error bulk updating prices: {e}")
+            return 0
+
     def get_all_products(self) -> List[Dict]:
         """Get all tracked products"""
         try:
@@ -233,6 +261,83 @@ class DatabaseManager:
             logger.error(f"Error getting price history: {e}")
             return pd.DataFrame()
 
+    def get_price_history_bulk(self, product_ids: List[int], days: int = 30) -> pd.DataFrame:
+        """Get price history for several products with a single query"""
+        if not product_ids:
+            return pd.DataFrame(columns=['product_id', 'timestamp', 'price'])
+        try:
+            conn = self.get_connection()
+            placeholders = ",".join("?" * len(product_ids))
+            query = f"""
+                SELECT product_id, timestamp, price
+                FROM price_history
+                WHERE product_id IN ({placeholders})
+                AND timestamp >= datetime('now', ?)
+                ORDER BY product_id, timestamp
+            """
+
+            df = pd.read_sql_query(query, conn, params=(*product_ids, f"-{int(days)} days"))
+            conn.close()
+
+            if not df.empty:
+                df['timestamp'] = pd.to_datetime(df['timestamp'])
+            return df
+        except Exception as e:
+            logger.error(f"Error getting bulk price history: {e}")
+            return pd.DataFrame(columns=['product_id', 'timestamp', 'price'])
+
+    def get_price_trend_m4(self, days: int = 30, buckets: int = 400, product_id: Optional[int] = None) -> pd.DataFrame:
+        """
+        Price history reduced with M4 binning for charting
+
+        The time range is split into `buckets` equal bins and only the first,
+        last, minimum and maximum price of each product's bin is returned, so the
+        result has at most 4 * buckets rows per product however many raw rows
+        exist, while peaks and dips are preserved. Bins never mix products, so
+        each product_id's rows form its own series. Covers all products unless
+        product_id is given.
+        """
+        try:
+            conn = self.get_connection()
+            query = """
+                WITH binned AS (
+                    SELECT product_id, timestamp, price,
+                           CAST((julianday(timestamp) - julianday('now', ?)) * ? AS INTEGER) AS bucket
+                    FROM price_history
+                    WHERE timestamp >= datetime('now', ?) AND price > 0
+                    {product_filter}
+                ),
+                ranked AS (
+                    SELECT product_id, timestamp, price,
+                           ROW_NUMBER() OVER (PARTITION BY product_id, bucket ORDER BY timestamp) AS rn_first,
+                           ROW_NUMBER() OVER (PARTITION BY product_id, bucket ORDER BY timestamp DESC) AS rn_last,
+                           ROW_NUMBER() OVER (PARTITION BY product_id, bucket ORDER BY price, timestamp) AS rn_min,
+                           ROW_NUMBER() OVER (PARTITION BY product_id, bucket ORDER BY price DESC, timestamp) AS rn_max
+                    FROM binned
+                )
+                SELECT product_id, timestamp, price
+                FROM ranked
+                WHERE rn_first = 1 OR rn_last = 1 OR rn_min = 1 OR rn_max = 1
+                ORDER BY product_id, timestamp
+            """
+            since = f"-{days} days"
+            params = [since, buckets / days, since]
+            if product_id is None:
+                query = query.format(product_filter="")
+            else:
+                query = query.format(product_filter="AND product_id = ?")
+                params.append(product_id)
+
+            df = pd.read_sql_query(query, conn, params=params)
+            conn.close()
+
+            if not df.empty:
+                df['timestamp'] = pd.to_datetime(df['timestamp'])
+            return df
+        except Exception as e:
+            logger.error(f"Error getting price trend: {e}")
+            return pd.DataFrame(columns=['product_id', 'timestamp', 'price'])
+
     def get_analytics_data(self) -> Dict:
         """Get analytics data"""
         try:
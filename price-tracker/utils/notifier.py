@@ -32,14 +32,25 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+SETTINGS_PATH = 'data/settings.json'
+
+# Last parsed settings, keyed by the file's mtime
+_settings_cache = {"mtime": None, "data": {}}
+
+
 def load_settings():
-    """Load settings from JSON file"""
+    """Load settings from JSON file, re-reading it only after it changes"""
     try:
-        with open('data/settings.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
+        mtime = os.path.getmtime(SETTINGS_PATH)
+    except OSError:
         return {}
 
+    if _settings_cache["mtime"] != mtime:
+        with open(SETTINGS_PATH, 'r') as f:
+            _settings_cache["data"] = json.load(f)
+        _settings_cache["mtime"] = mtime
+    return dict(_settings_cache["data"])
+
 
 class EmailNotifier:
     """Sends email notifications for price changes"""